@@ -1,7 +1,193 @@
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .__about__ import __application__, __author__, __version__
-from ._basic_auth import BasicAuthProvider
-from ._jwt import JWTAuthProvider
-from ._pre_auth import PreAuthProvider
+
+if TYPE_CHECKING:
+    from ._basic_auth import BasicAuthProvider
+    from ._cloudevents import CloudEvent, CloudEventsIngestor, IngestError, IngestReport, read_ndjson_events
+    from ._connections import (
+        ConnectionHealth,
+        ConnectionLogEntry,
+        ConnectionRates,
+        ResourceCounts,
+        connection_health,
+        enable_connection_logs,
+        fetch_connection_logs,
+        fetch_connection_metrics,
+        fetch_connection_status,
+        follow_connection_logs,
+        iter_connection_status,
+        list_connection_ids,
+        metric_counters,
+        watch_connection_metrics,
+    )
+    from ._devops import (
+        ConfigDelta,
+        ConfigSnapshotStore,
+        LogLevelUpdateReport,
+        PiggybackResult,
+        PiggybackTarget,
+        PodLogLevel,
+        config_drift,
+        diff_configs,
+        fetch_pod_configs,
+        get_log_levels,
+        list_logging_modules,
+        log_level_override,
+        resolve_modules,
+        run_piggyback,
+        update_log_levels,
+    )
+    from ._history import RevisionDelta, fetch_history, iter_history
+    from ._jwt import JWTAuthProvider
+    from ._messages import CallResult, DispatchFailure, DispatchReport, MessageDispatcher, broadcast, call_many
+    from ._permissions import PermissionChecker
+    from ._policies import (
+        PolicyApplyReport,
+        PolicyChange,
+        PolicyEditor,
+        PolicyWrite,
+        apply_policies,
+        apply_policy_writes,
+        load_policy_documents,
+        plan_policies,
+        plan_policy_update,
+        plan_policy_writes,
+        policy_content,
+        policy_hash,
+        sync_policies,
+    )
+    from ._pre_auth import PreAuthProvider
+    from ._projection import ProjectionRecorder, minimal_fields
+    from ._properties import get_attribute, get_desired_property, get_feature_property, get_value
+    from ._read_batcher import ReadBatcher
+    from ._response_cache import ResponseCache
+    from ._rql import (
+        And,
+        Eq,
+        Exists,
+        Ge,
+        Gt,
+        ILike,
+        In,
+        Le,
+        Like,
+        Lt,
+        Ne,
+        Not,
+        Or,
+        Query,
+        RQLSyntaxError,
+        canonical_filter,
+        parse_filter,
+    )
+    from ._search_count import CountCache, CountQuery, count_groups, normalize_filter
+    from ._search_projection import project_values
+    from ._sync import SyncDittoClient
+    from ._write_planner import WriteOperation, apply_writes, plan_thing_update, plan_writes
+
+# Submodules are imported on first use of their names, so that importing a single module,
+# e.g. the daemon client, does not load the whole client and its dependencies
+_EXPORTS = {
+    "._basic_auth": ("BasicAuthProvider",),
+    "._cloudevents": ("CloudEvent", "CloudEventsIngestor", "IngestError", "IngestReport", "read_ndjson_events"),
+    "._connections": (
+        "ConnectionHealth",
+        "ConnectionLogEntry",
+        "ConnectionRates",
+        "ResourceCounts",
+        "connection_health",
+        "enable_connection_logs",
+        "fetch_connection_logs",
+        "fetch_connection_metrics",
+        "fetch_connection_status",
+        "follow_connection_logs",
+        "iter_connection_status",
+        "list_connection_ids",
+        "metric_counters",
+        "watch_connection_metrics",
+    ),
+    "._devops": (
+        "ConfigDelta",
+        "ConfigSnapshotStore",
+        "LogLevelUpdateReport",
+        "PiggybackResult",
+        "PiggybackTarget",
+        "PodLogLevel",
+        "config_drift",
+        "diff_configs",
+        "fetch_pod_configs",
+        "get_log_levels",
+        "list_logging_modules",
+        "log_level_override",
+        "resolve_modules",
+        "run_piggyback",
+        "update_log_levels",
+    ),
+    "._history": ("RevisionDelta", "fetch_history", "iter_history"),
+    "._jwt": ("JWTAuthProvider",),
+    "._messages": ("CallResult", "DispatchFailure", "DispatchReport", "MessageDispatcher", "broadcast", "call_many"),
+    "._permissions": ("PermissionChecker",),
+    "._policies": (
+        "PolicyApplyReport",
+        "PolicyChange",
+        "PolicyEditor",
+        "PolicyWrite",
+        "apply_policies",
+        "apply_policy_writes",
+        "load_policy_documents",
+        "plan_policies",
+        "plan_policy_update",
+        "plan_policy_writes",
+        "policy_content",
+        "policy_hash",
+        "sync_policies",
+    ),
+    "._pre_auth": ("PreAuthProvider",),
+    "._projection": ("ProjectionRecorder", "minimal_fields"),
+    "._properties": ("get_attribute", "get_desired_property", "get_feature_property", "get_value"),
+    "._read_batcher": ("ReadBatcher",),
+    "._response_cache": ("ResponseCache",),
+    "._rql": (
+        "And",
+        "Eq",
+        "Exists",
+        "Ge",
+        "Gt",
+        "ILike",
+        "In",
+        "Le",
+        "Like",
+        "Lt",
+        "Ne",
+        "Not",
+        "Or",
+        "Query",
+        "RQLSyntaxError",
+        "canonical_filter",
+        "parse_filter",
+    ),
+    "._search_count": ("CountCache", "CountQuery", "count_groups", "normalize_filter"),
+    "._search_projection": ("project_values",),
+    "._sync": ("SyncDittoClient",),
+    "._write_planner": ("WriteOperation", "apply_writes", "plan_thing_update", "plan_writes"),
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+
+def __getattr__(name: str) -> Any:
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(__all__)
+
 
 __all__ = [
     "__version__",
@@ -10,4 +196,96 @@ __all__ = [
     "BasicAuthProvider",
     "JWTAuthProvider",
     "PreAuthProvider",
+    "RevisionDelta",
+    "fetch_history",
+    "iter_history",
+    "WriteOperation",
+    "plan_writes",
+    "plan_thing_update",
+    "apply_writes",
+    "get_value",
+    "get_attribute",
+    "get_feature_property",
+    "get_desired_property",
+    "ReadBatcher",
+    "project_values",
+    "MessageDispatcher",
+    "DispatchReport",
+    "DispatchFailure",
+    "broadcast",
+    "CallResult",
+    "call_many",
+    "CloudEvent",
+    "CloudEventsIngestor",
+    "IngestReport",
+    "IngestError",
+    "read_ndjson_events",
+    "PermissionChecker",
+    "PolicyApplyReport",
+    "PolicyChange",
+    "PolicyEditor",
+    "PolicyWrite",
+    "apply_policies",
+    "apply_policy_writes",
+    "load_policy_documents",
+    "plan_policies",
+    "plan_policy_update",
+    "plan_policy_writes",
+    "policy_content",
+    "policy_hash",
+    "sync_policies",
+    "ConnectionHealth",
+    "ConnectionLogEntry",
+    "ConnectionRates",
+    "ResourceCounts",
+    "connection_health",
+    "enable_connection_logs",
+    "fetch_connection_logs",
+    "fetch_connection_metrics",
+    "fetch_connection_status",
+    "follow_connection_logs",
+    "iter_connection_status",
+    "list_connection_ids",
+    "metric_counters",
+    "watch_connection_metrics",
+    "LogLevelUpdateReport",
+    "PodLogLevel",
+    "get_log_levels",
+    "list_logging_modules",
+    "log_level_override",
+    "resolve_modules",
+    "update_log_levels",
+    "PiggybackResult",
+    "PiggybackTarget",
+    "run_piggyback",
+    "ConfigDelta",
+    "ConfigSnapshotStore",
+    "config_drift",
+    "diff_configs",
+    "fetch_pod_configs",
+    "CountCache",
+    "CountQuery",
+    "count_groups",
+    "normalize_filter",
+    "Query",
+    "And",
+    "Or",
+    "Not",
+    "Eq",
+    "Ne",
+    "Gt",
+    "Ge",
+    "Lt",
+    "Le",
+    "Like",
+    "ILike",
+    "In",
+    "Exists",
+    "RQLSyntaxError",
+    "parse_filter",
+    "canonical_filter",
+    "ProjectionRecorder",
+    "minimal_fields",
+    "SyncDittoClient",
+    "ResponseCache",
 ]
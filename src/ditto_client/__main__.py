@@ -1,23 +1,33 @@
-import asyncio
+import hashlib
 import logging
+from collections.abc import Callable
 from enum import StrEnum
+from functools import partial
 from typing import Annotated, cast
 
 import typer
 from dotenv import load_dotenv
+from kiota_abstractions.authentication.authentication_provider import AuthenticationProvider
 from kiota_http.httpx_request_adapter import HttpxRequestAdapter
+from kiota_http.kiota_client_factory import KiotaClientFactory
 from typer import Context, Typer
 
 from ditto_client import __version__
 from ditto_client._basic_auth import BasicAuthProvider
 from ditto_client._jwt import JWTAuthProvider
 from ditto_client._pre_auth import PreAuthProvider
+from ditto_client._response_cache import ResponseCache
 from ditto_client._types import CmdState
+from ditto_client.cli._batch import batch
+from ditto_client.cli._cloudevents import cloudevents_app
+from ditto_client.cli._daemon import ClientPool, daemon
 from ditto_client.cli._devops import devops_app
-from ditto_client.cli._output import output_json, output_message, output_table
+from ditto_client.cli._output import TableStream, output_json, output_message
 from ditto_client.cli._permission import permission_app
 from ditto_client.cli._policy import policy_app
+from ditto_client.cli._runner import SESSION_COMMANDS
 from ditto_client.cli._search import search_app
+from ditto_client.cli._shell import shell
 from ditto_client.cli._thing import thing_app
 from ditto_client.generated.ditto_client import DittoClient
 
@@ -28,7 +38,11 @@ cli_app.add_typer(policy_app, name="policy", help="Policy management")
 cli_app.add_typer(thing_app, name="thing", help="Thing management")
 cli_app.add_typer(search_app, name="search", help="Thing search")
 cli_app.add_typer(permission_app, name="permission", help="Permission check")
+cli_app.add_typer(cloudevents_app, name="cloudevents", help="CloudEvents ingestion")
 cli_app.add_typer(devops_app, name="devops", help="DevOps")
+cli_app.command()(batch)
+cli_app.command()(shell)
+cli_app.command()(daemon)
 
 
 LOG_LEVELS = {
@@ -48,28 +62,26 @@ class DittoAuthType(StrEnum):
     JWT = "jwt"
 
 
-def _create_jwt_client(base_url: str, jwt_token: str) -> DittoClient:
-    auth_provider = JWTAuthProvider(token=jwt_token)
-    request_adapter = HttpxRequestAdapter(auth_provider)
+def _create_client(base_url: str, auth_provider: AuthenticationProvider, cache: ResponseCache) -> DittoClient:
+    http_client = KiotaClientFactory.create_with_custom_middleware(
+        [cache, *KiotaClientFactory.get_default_middleware(None)]
+    )
+    request_adapter = HttpxRequestAdapter(auth_provider, http_client=http_client)
     request_adapter.base_url = base_url
 
     return DittoClient(request_adapter)
 
 
-def _create_ba_client(base_url: str, user_name: str, password: str) -> DittoClient:
-    auth_provider = BasicAuthProvider(user_name=user_name, password=password)
-    request_adapter = HttpxRequestAdapter(auth_provider)
-    request_adapter.base_url = base_url
+def _create_jwt_client(base_url: str, jwt_token: str, cache: ResponseCache) -> DittoClient:
+    return _create_client(base_url, JWTAuthProvider(token=jwt_token), cache)
 
-    return DittoClient(request_adapter)
 
+def _create_ba_client(base_url: str, user_name: str, password: str, cache: ResponseCache) -> DittoClient:
+    return _create_client(base_url, BasicAuthProvider(user_name=user_name, password=password), cache)
 
-def _create_pre_auth_client(base_url: str, auth_subject: str) -> DittoClient:
-    auth_provider = PreAuthProvider(auth_subject=auth_subject)
-    request_adapter = HttpxRequestAdapter(auth_provider)
-    request_adapter.base_url = base_url
 
-    return DittoClient(request_adapter)
+def _create_pre_auth_client(base_url: str, auth_subject: str, cache: ResponseCache) -> DittoClient:
+    return _create_client(base_url, PreAuthProvider(auth_subject=auth_subject), cache)
 
 
 @cli_app.command()
@@ -88,17 +100,15 @@ def whoami(
             return
 
         if use_table:
-            output_table(
+            with TableStream(
                 title="Current User Information",
                 columns=[
                     ("Property", "right", "cyan"),
                     ("Value", "left", "green"),
                 ],
-                rows=[
-                    ["Default Subject", response.default_subject or "N/A"],
-                    ["Subjects", ", ".join(response.subjects) if response.subjects else "None"],
-                ],
-            )
+            ) as table:
+                table.add_row(["Default Subject", response.default_subject or "N/A"])
+                table.add_row(["Subjects", ", ".join(response.subjects) if response.subjects else "None"])
         else:
             output_json(
                 {
@@ -107,7 +117,7 @@ def whoami(
                 },
             )
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @cli_app.callback()
@@ -176,25 +186,49 @@ def main(
         ),
     ] = False,
 ) -> None:
-    logging.basicConfig(level=logging.WARNING)
-    logging.getLogger("ditto_client").setLevel(LOG_LEVELS.get(loglevel, logging.WARNING))
+    # Set when the command was forwarded to a daemon
+    pool = ctx.obj if isinstance(ctx.obj, ClientPool) else None
+    # Logging is global to the process, so forwarded commands keep the daemon's log level
+    if pool is None:
+        logging.basicConfig(level=logging.WARNING)
+        logging.getLogger("ditto_client").setLevel(LOG_LEVELS.get(loglevel, logging.WARNING))
+
+    if pool is not None and ctx.invoked_subcommand in SESSION_COMMANDS:
+        output_message(f"'{ctx.invoked_subcommand}' cannot run in the daemon", level="error")
+        raise typer.Exit(code=2)
 
     ctx.ensure_object(CmdState)
     ctx.obj = CmdState()
     ctx.obj.table = table
+    # Disabled unless a command enables it, e.g. the shell
+    ctx.obj.cache = ResponseCache(ttl=0)
+    if ctx.invoked_subcommand == "daemon":
+        # Clients are created per forwarded command
+        return
 
+    create: Callable[[ResponseCache], DittoClient]
     if auth_type == DittoAuthType.JWT:
         if not jwt_token:
             output_message("JWT token is required for JWT authentication", level="error")
             raise typer.Exit(code=1)
-        ctx.obj.client = _create_jwt_client(base_url, jwt_token)
+        identity = jwt_token
+        create = partial(_create_jwt_client, base_url, jwt_token)
     elif auth_type == DittoAuthType.PRE_AUTH:
         if not preauth_subject:
             output_message("Auth subject is required for pre-authentication", level="error")
             raise typer.Exit(code=1)
-        ctx.obj.client = _create_pre_auth_client(base_url, preauth_subject)
+        identity = preauth_subject
+        create = partial(_create_pre_auth_client, base_url, preauth_subject)
     else:
         if not username or not password:
             output_message("Username and password are required for basic authentication", level="error")
             raise typer.Exit(code=1)
-        ctx.obj.client = _create_ba_client(base_url, username, password)
+        identity = f"{username}:{password}"
+        create = partial(_create_ba_client, base_url, username, password)
+
+    if pool is None:
+        ctx.obj.client = create(ctx.obj.cache)
+    else:
+        ctx.obj.loop = pool.loop
+        key = (base_url, auth_type.value, hashlib.sha256(identity.encode("utf-8")).hexdigest())
+        ctx.obj.client, ctx.obj.cache, ctx.obj.count_cache = pool.client(key, create)
@@ -0,0 +1,336 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import stat
+import time
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, BinaryIO
+
+import httpx
+from kiota_abstractions.api_error import APIError
+from kiota_abstractions.method import Method
+
+from ditto_client._raw import build_request, encode_json, send_no_content
+from ditto_client.generated.ditto_client import DittoClient
+
+logger = logging.getLogger(__name__)
+
+DITTO_PROTOCOL_CONTENT_TYPE = "application/vnd.eclipse.ditto+json"
+
+# Status codes that signal an overloaded gateway rather than a bad event
+_OVERLOAD_STATUS_CODES = frozenset({408, 429, 502, 503, 504})
+
+_CONTEXT_ATTRIBUTES = frozenset({"specversion", "id", "source", "type", "time", "datacontenttype", "dataschema"})
+_DATA_ATTRIBUTES = frozenset({"data", "data_base64"})
+
+
+@dataclass
+class CloudEvent:
+    """A CloudEvent carrying a Ditto Protocol message, sent in binary content mode.
+
+    The event attributes travel as `ce-*` headers and `data` is the raw request body.
+    """
+
+    data: bytes
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    source: str = "ditto-client"
+    type: str = "org.eclipse.ditto.protocol"
+    time: str = field(default_factory=lambda: datetime.now(UTC).isoformat().replace("+00:00", "Z"))
+    specversion: str = "1.0"
+    datacontenttype: str = DITTO_PROTOCOL_CONTENT_TYPE
+    dataschema: str | None = None
+    extensions: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(
+        cls,
+        line: bytes,
+        source: str = "ditto-client",
+        type: str = "org.eclipse.ditto.protocol",
+    ) -> "CloudEvent":
+        """Create an event from one JSON document.
+
+        A structured-mode CloudEvent (a JSON object with `specversion`) is converted to binary
+        mode. Anything else is treated as a plain Ditto Protocol message and used unchanged
+        as the event data, with the given `source` and `type`.
+        """
+        document = json.loads(line)
+        if not isinstance(document, dict) or "specversion" not in document:
+            return cls(data=line.strip(), source=source, type=type)
+
+        datacontenttype = str(document.get("datacontenttype", DITTO_PROTOCOL_CONTENT_TYPE))
+        if "data_base64" in document:
+            data = base64.b64decode(document["data_base64"])
+        elif isinstance(document.get("data"), str) and not _is_json(datacontenttype):
+            # e.g. text/plain data is sent as is, not as a JSON string
+            data = document["data"].encode("utf-8")
+        else:
+            data = encode_json(document.get("data"))
+
+        event = cls(
+            data=data,
+            source=str(document.get("source", source)),
+            type=str(document.get("type", type)),
+            specversion=str(document["specversion"]),
+            datacontenttype=datacontenttype,
+            dataschema=document.get("dataschema"),
+            extensions={
+                key: str(value)
+                for key, value in document.items()
+                if key not in _CONTEXT_ATTRIBUTES and key not in _DATA_ATTRIBUTES
+            },
+        )
+        if "id" in document:
+            event.id = str(document["id"])
+        if "time" in document:
+            event.time = str(document["time"])
+        return event
+
+    def headers(self) -> dict[str, str]:
+        """The `ce-*` headers of the event in binary content mode."""
+        headers = {
+            "ce-specversion": self.specversion,
+            "ce-id": self.id,
+            "ce-source": self.source,
+            "ce-type": self.type,
+            "ce-time": self.time,
+        }
+        if self.dataschema:
+            headers["ce-dataschema"] = self.dataschema
+        headers.update({f"ce-{key}": value for key, value in self.extensions.items()})
+        return headers
+
+
+@dataclass
+class IngestError:
+    """An event that Ditto did not accept."""
+
+    index: int
+    event_id: str
+    error: BaseException
+
+
+@dataclass
+class IngestReport:
+    """Outcome of a CloudEvents ingestion run."""
+
+    sent: int = 0
+    errors: list[IngestError] = field(default_factory=list)
+    retried: int = 0
+    elapsed: float = 0.0
+    final_concurrency: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Events per second, including failed ones."""
+        total = self.sent + len(self.errors)
+        return total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "failed": len(self.errors),
+            "retried": self.retried,
+            "elapsed": round(self.elapsed, 3),
+            "throughput": round(self.throughput, 1),
+            "concurrency": self.final_concurrency,
+            "errors": [{"index": e.index, "id": e.event_id, "error": str(e.error)} for e in self.errors],
+        }
+
+
+class _AdaptiveLimit:
+    """AIMD concurrency limit: grows by one per window of successes and halves on overload."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int) -> None:
+        self._minimum = minimum
+        self._maximum = maximum
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+
+    async def abandon(self) -> None:
+        """Free a slot without adapting the limit, e.g. when a request was cancelled."""
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    async def release(self, overloaded: bool) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            if overloaded:
+                self._limit = max(float(self._minimum), self._limit / 2)
+            else:
+                self._limit = min(float(self._maximum), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+
+def _is_json(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type in ("application/json", "text/json") or media_type.endswith("+json")
+
+
+def _is_overload(error: BaseException) -> bool:
+    if isinstance(error, APIError):
+        return error.response_status_code in _OVERLOAD_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+class CloudEventsIngestor:
+    """Posts a stream of CloudEvents to `/api/2/cloudevents` with adaptive concurrency.
+
+    The number of requests in flight starts at `initial_concurrency` and adapts between
+    `min_concurrency` and `max_in_flight`: it grows while events are accepted and is halved
+    when the gateway signals overload (408, 429, 5xx or transport timeouts). Events that hit
+    an overload are retried up to `retries` times. The source is only read as fast as events
+    can be sent, so a slow gateway applies backpressure to the producer.
+    """
+
+    def __init__(
+        self,
+        client: DittoClient,
+        max_in_flight: int = 256,
+        initial_concurrency: int = 16,
+        min_concurrency: int = 1,
+        retries: int = 3,
+    ) -> None:
+        if not 1 <= min_concurrency <= max_in_flight:
+            raise ValueError("min_concurrency must be between 1 and max_in_flight")
+
+        self._client = client
+        self._max_in_flight = max_in_flight
+        self._initial_concurrency = initial_concurrency
+        self._min_concurrency = min_concurrency
+        self._retries = retries
+
+    async def _post(self, event: CloudEvent) -> None:
+        builder = self._client.api.two.cloudevents
+        request_info = build_request(builder, Method.POST, body=event.data, content_type=event.datacontenttype)
+        for name, value in event.headers().items():
+            request_info.headers.add(name, value)
+        await send_no_content(builder.request_adapter, request_info)
+
+    async def ingest(self, events: AsyncIterable[CloudEvent] | Iterable[CloudEvent]) -> IngestReport:
+        """Send all events and return a report with per-event errors."""
+        report = IngestReport()
+        limit = _AdaptiveLimit(self._initial_concurrency, self._min_concurrency, self._max_in_flight)
+        tasks: set[asyncio.Task[None]] = set()
+
+        async def _send(index: int, event: CloudEvent) -> None:
+            attempt = 0
+            # Whether this event holds a slot of the limit
+            holding = True
+            try:
+                while True:
+                    try:
+                        await self._post(event)
+                    except Exception as e:
+                        overloaded = _is_overload(e)
+                        await limit.release(overloaded)
+                        holding = False
+                        if overloaded and attempt < self._retries:
+                            attempt += 1
+                            report.retried += 1
+                            await asyncio.sleep(0.1 * 2**attempt)
+                            await limit.acquire()
+                            holding = True
+                            continue
+                        logger.debug("CloudEvent %d ('%s') failed: %s", index, event.id, e)
+                        report.errors.append(IngestError(index, event.id, e))
+                        return
+                    await limit.release(False)
+                    holding = False
+                    report.sent += 1
+                    return
+            finally:
+                if holding:
+                    # Cancelled while posting; the slot must be freed even if cancelled again
+                    await asyncio.shield(limit.abandon())
+
+        started = time.perf_counter()
+        index = 0
+        async for event in _aiter(events):
+            await limit.acquire()
+            task = asyncio.ensure_future(_send(index, event))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            index += 1
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+        report.elapsed = time.perf_counter() - started
+        report.final_concurrency = limit.limit
+        return report
+
+
+async def _aiter(events: AsyncIterable[CloudEvent] | Iterable[CloudEvent]) -> AsyncIterator[CloudEvent]:
+    if isinstance(events, AsyncIterable):
+        async for event in events:
+            yield event
+    else:
+        for event in events:
+            yield event
+
+
+async def read_ndjson_events(
+    stream: BinaryIO,
+    source: str = "ditto-client",
+    type: str = "org.eclipse.ditto.protocol",
+) -> AsyncIterator[CloudEvent]:
+    """Read CloudEvents (or plain Ditto Protocol messages) from an NDJSON stream.
+
+    Pipes and terminals are read without blocking the event loop. Blank lines are skipped
+    and lines that are not valid JSON are logged and skipped.
+    """
+
+    def _parse(number: int, line: bytes) -> CloudEvent | None:
+        if not line.strip():
+            return None
+        try:
+            return CloudEvent.from_json(line, source, type)
+        except ValueError as e:
+            logger.warning("Skipping line %d: %s", number, e)
+            return None
+
+    if stat.S_ISREG(os.fstat(stream.fileno()).st_mode):
+        for number, line in enumerate(stream, start=1):
+            event = _parse(number, line)
+            if event is not None:
+                yield event
+        return
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=2**24)
+    # Closing the transport closes its file, so read from a duplicate and keep e.g. stdin open.
+    # The duplicate shares the blocking mode, which the transport changes.
+    blocking = os.get_blocking(stream.fileno())
+    pipe = os.fdopen(os.dup(stream.fileno()), "rb")
+    try:
+        transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    except BaseException:
+        pipe.close()
+        raise
+    try:
+        number = 0
+        async for line in reader:
+            number += 1
+            event = _parse(number, line)
+            if event is not None:
+                yield event
+    finally:
+        transport.close()
+        os.set_blocking(stream.fileno(), blocking)
@@ -0,0 +1,53 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def map_ordered(func: Callable[[T], Awaitable[R]], items: Iterable[T], limit: int) -> AsyncIterator[R]:
+    """Apply an async function to items with at most `limit` calls in flight, yielding results in input order.
+
+    Args:
+        func: The coroutine function to apply to every item
+        items: The items to process, consumed lazily
+        limit: Maximum number of concurrent calls
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    iterator = iter(items)
+    pending: deque[asyncio.Task[R]] = deque()
+
+    def _schedule() -> None:
+        for item in iterator:
+            pending.append(asyncio.ensure_future(func(item)))
+            return
+
+    try:
+        for _ in range(limit):
+            _schedule()
+
+        while pending:
+            result = await pending.popleft()
+            _schedule()
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def gather_bounded(aws: Iterable[Awaitable[T]], limit: int) -> list[T]:
+    """Await all awaitables with at most `limit` running concurrently and return results in input order."""
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return list(await asyncio.gather(*(_run(aw) for aw in aws)))
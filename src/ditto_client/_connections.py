@@ -0,0 +1,437 @@
+import asyncio
+import json
+import logging
+import re
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+
+from ditto_client._concurrency import gather_bounded
+from ditto_client._raw import send_json
+from ditto_client.generated.api.two.connections.connections_request_builder import ConnectionsRequestBuilder
+from ditto_client.generated.ditto_client import DittoClient
+
+logger = logging.getLogger(__name__)
+
+_DURATION = re.compile(r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+async def list_connection_ids(client: DittoClient) -> list[str]:
+    """Return the IDs of all connections."""
+    query_params = ConnectionsRequestBuilder.ConnectionsRequestBuilderGetQueryParameters()
+    query_params.ids_only = True
+    builder = client.api.two.connections
+    response = await send_json(
+        builder.request_adapter,
+        builder.to_get_request_information(RequestConfiguration(query_parameters=query_params)),
+    )
+    return [item if isinstance(item, str) else item.get("id", "") for item in response or []]
+
+
+async def fetch_connection_metrics(
+    client: DittoClient,
+    connection_ids: Iterable[str],
+    concurrency: int = 16,
+) -> dict[str, Any]:
+    """Fetch the metrics of many connections concurrently.
+
+    Returns the metrics document per connection ID, or the exception if it could not be read.
+    """
+    ids = list(dict.fromkeys(connection_ids))
+
+    async def _fetch(connection_id: str) -> Any:
+        builder = client.api.two.connections.by_connection_id(connection_id).metrics
+        try:
+            return await send_json(builder.request_adapter, builder.to_get_request_information())
+        except Exception as e:
+            return e
+
+    results = await gather_bounded((_fetch(connection_id) for connection_id in ids), concurrency)
+    return dict(zip(ids, results, strict=True))
+
+
+def _window_seconds(window: str) -> int | None:
+    match = _DURATION.match(window)
+    if match is None:
+        return None
+    days, hours, minutes, seconds = (int(group or 0) for group in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def metric_counters(metrics: dict[str, Any]) -> dict[str, int]:
+    """Flatten the overall metrics of a connection into `direction.metric.outcome` counters.
+
+    Ditto counts messages in sliding windows (`PT1M`, `PT1H`, `PT24H`); the longest window
+    is used as the counter. The overall metrics are the sum of the per-address source and
+    target metrics.
+    """
+    counters: dict[str, int] = {}
+    overall = metrics.get("connectionMetrics") or {}
+    for direction in ("inbound", "outbound"):
+        for metric, outcomes in (overall.get(direction) or {}).items():
+            if not isinstance(outcomes, dict):
+                continue
+            for outcome in ("success", "failure"):
+                windows = outcomes.get(outcome)
+                if not isinstance(windows, dict):
+                    continue
+                counts = [
+                    (seconds, value)
+                    for window, value in windows.items()
+                    if isinstance(value, int) and (seconds := _window_seconds(window)) is not None
+                ]
+                if counts:
+                    counters[f"{direction}.{metric}.{outcome}"] = max(counts)[1]
+    return counters
+
+
+@dataclass
+class ConnectionRates:
+    """Message counts and rates of one connection over a polling interval.
+
+    `deltas` are keyed by `direction.metric.outcome`, e.g. `inbound.consumed.success`.
+    """
+
+    connection_id: str
+    interval: float = 0.0
+    deltas: dict[str, int] = field(default_factory=dict)
+    contains_failures: bool = False
+    error: BaseException | None = None
+
+    def rate(self, key: str) -> float:
+        """Messages per second of a counter."""
+        return self.deltas.get(key, 0) / self.interval if self.interval > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "connectionId": self.connection_id,
+            "interval": round(self.interval, 3),
+            "containsFailures": self.contains_failures,
+            "deltas": self.deltas,
+            "rates": {key: round(self.rate(key), 3) for key in self.deltas},
+        }
+        if self.error is not None:
+            result["error"] = str(self.error)
+        return result
+
+
+@dataclass
+class _MetricsSample:
+    taken_at: float
+    counters: dict[str, int]
+    contains_failures: bool
+
+
+async def watch_connection_metrics(
+    client: DittoClient,
+    connection_ids: Iterable[str] | None = None,
+    interval: float = 5.0,
+    concurrency: int = 16,
+) -> AsyncIterator[list[ConnectionRates]]:
+    """Poll the metrics of connections and yield their rates after every interval.
+
+    All connections are polled concurrently on every tick. Because Ditto's counters are
+    sliding windows, a delta is an approximation and never negative.
+
+    Args:
+        client: The Ditto client
+        connection_ids: The connections to watch, all connections if omitted
+        interval: Seconds between polls
+        concurrency: Maximum number of concurrent requests
+    """
+    ids = list(connection_ids) if connection_ids is not None else await list_connection_ids(client)
+    loop = asyncio.get_running_loop()
+    previous: dict[str, _MetricsSample] = {}
+
+    async def _poll() -> dict[str, _MetricsSample | BaseException]:
+        metrics = await fetch_connection_metrics(client, ids, concurrency)
+        taken_at = loop.time()
+        return {
+            connection_id: (
+                value
+                if isinstance(value, BaseException)
+                else _MetricsSample(taken_at, metric_counters(value or {}), bool((value or {}).get("containsFailures")))
+            )
+            for connection_id, value in metrics.items()
+        }
+
+    next_tick = loop.time()
+    while True:
+        results: list[ConnectionRates] = []
+        for connection_id, sample in (await _poll()).items():
+            if isinstance(sample, BaseException):
+                results.append(ConnectionRates(connection_id, error=sample))
+                continue
+
+            before = previous.get(connection_id)
+            previous[connection_id] = sample
+            if before is None:
+                continue
+            results.append(
+                ConnectionRates(
+                    connection_id,
+                    interval=sample.taken_at - before.taken_at,
+                    deltas={key: max(value - before.counters.get(key, 0), 0) for key, value in sample.counters.items()},
+                    contains_failures=sample.contains_failures,
+                )
+            )
+
+        if results:
+            yield results
+
+        next_tick += interval
+        await asyncio.sleep(max(next_tick - loop.time(), 0))
+
+
+async def enable_connection_logs(client: DittoClient, connection_ids: Iterable[str], concurrency: int = 16) -> None:
+    """Enable logging of many connections concurrently; Ditto keeps it enabled for 24 hours."""
+    await gather_bounded(
+        (
+            client.api.two.connections.by_connection_id(connection_id).command.post(
+                "connectivity.commands:enableConnectionLogs"
+            )
+            for connection_id in dict.fromkeys(connection_ids)
+        ),
+        concurrency,
+    )
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an Instant for comparison; as strings, '...:00Z' would sort after '...:00.123Z'."""
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        timestamp = datetime.min
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+    return timestamp
+
+
+@dataclass(frozen=True)
+class ConnectionLogEntry:
+    """A log entry of a connection, see `LogEntry` for its fields."""
+
+    connection_id: str
+    entry: dict[str, Any]
+
+    @property
+    def timestamp(self) -> str:
+        return str(self.entry.get("timestamp") or "")
+
+    def sort_key(self) -> tuple[datetime, str]:
+        return _parse_timestamp(self.timestamp), self.connection_id
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"connectionId": self.connection_id, **self.entry}
+
+
+class _LogCursor:
+    """Remembers the newest timestamp seen in a connection's log buffer.
+
+    Entries sharing the newest timestamp are remembered too, so that entries logged in the
+    same millisecond as the last poll are neither lost nor repeated.
+    """
+
+    def __init__(self) -> None:
+        self._last = _parse_timestamp("")
+        self._seen: set[str] = set()
+
+    def advance(self, entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        new: list[dict[str, Any]] = []
+        for entry in entries:
+            timestamp = _parse_timestamp(str(entry.get("timestamp") or ""))
+            fingerprint = json.dumps(entry, sort_keys=True)
+            if timestamp < self._last or (timestamp == self._last and fingerprint in self._seen):
+                continue
+            new.append(entry)
+            if timestamp > self._last:
+                self._last, self._seen = timestamp, set()
+            self._seen.add(fingerprint)
+        return new
+
+
+async def _fetch_logs(client: DittoClient, connection_id: str) -> list[dict[str, Any]]:
+    builder = client.api.two.connections.by_connection_id(connection_id).logs
+    response = await send_json(builder.request_adapter, builder.to_get_request_information())
+    entries = (response or {}).get("connectionLogs") or []
+    return sorted(
+        (entry for entry in entries if isinstance(entry, dict)),
+        key=lambda entry: _parse_timestamp(str(entry.get("timestamp") or "")),
+    )
+
+
+async def fetch_connection_logs(
+    client: DittoClient,
+    connection_ids: Iterable[str],
+    concurrency: int = 16,
+) -> list[ConnectionLogEntry]:
+    """Fetch the log buffers of many connections concurrently, merged in time order."""
+    ids = list(dict.fromkeys(connection_ids))
+    logs = await gather_bounded((_fetch_logs(client, connection_id) for connection_id in ids), concurrency)
+    entries = [
+        ConnectionLogEntry(connection_id, entry)
+        for connection_id, connection_logs in zip(ids, logs, strict=True)
+        for entry in connection_logs
+    ]
+    return sorted(entries, key=ConnectionLogEntry.sort_key)
+
+
+async def follow_connection_logs(
+    client: DittoClient,
+    connection_ids: Iterable[str],
+    interval: float = 2.0,
+    max_interval: float = 30.0,
+    backlog: bool = True,
+    concurrency: int = 16,
+) -> AsyncIterator[ConnectionLogEntry]:
+    """Follow the logs of many connections and yield only new entries, merged in time order.
+
+    Ditto always returns a connection's whole log buffer, so every poll is compared with the
+    newest timestamp seen per connection. While no new entries arrive, the polling interval
+    doubles up to `max_interval` and drops back to `interval` with the next entry.
+
+    Args:
+        client: The Ditto client
+        connection_ids: The connections to follow
+        interval: Seconds between polls while entries arrive
+        max_interval: Maximum seconds between polls while idle
+        backlog: Also yield the entries already in the buffers when following starts
+        concurrency: Maximum number of concurrent requests
+    """
+    ids = list(dict.fromkeys(connection_ids))
+    cursors = {connection_id: _LogCursor() for connection_id in ids}
+
+    async def _poll(connection_id: str) -> list[ConnectionLogEntry]:
+        try:
+            entries = await _fetch_logs(client, connection_id)
+        except Exception as e:
+            logger.warning("Reading the logs of connection '%s' failed: %s", connection_id, e)
+            return []
+        return [ConnectionLogEntry(connection_id, entry) for entry in cursors[connection_id].advance(entries)]
+
+    delay = interval
+    first = True
+    while True:
+        polled = await gather_bounded((_poll(connection_id) for connection_id in ids), concurrency)
+        new = sorted((entry for entries in polled for entry in entries), key=ConnectionLogEntry.sort_key)
+        if first and not backlog:
+            new = []
+        first = False
+
+        for entry in new:
+            yield entry
+
+        delay = interval if new else min(delay * 2, max_interval)
+        await asyncio.sleep(delay)
+
+
+@dataclass
+class ResourceCounts:
+    """How many resources of a kind (clients, sources, targets) are open."""
+
+    open: int = 0
+    total: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.open}/{self.total}"
+
+
+@dataclass
+class ConnectionHealth:
+    """Aggregated status of a connection and its client, source and target resources.
+
+    `problems` lists every resource that is not open, with its status details.
+    """
+
+    connection_id: str
+    connection_status: str = ""
+    live_status: str = ""
+    connected_since: str = ""
+    clients: ResourceCounts = field(default_factory=ResourceCounts)
+    sources: ResourceCounts = field(default_factory=ResourceCounts)
+    targets: ResourceCounts = field(default_factory=ResourceCounts)
+    problems: list[str] = field(default_factory=list)
+    error: BaseException | None = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.error is None and not self.problems and self.live_status in ("", "open")
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "connectionId": self.connection_id,
+            "connectionStatus": self.connection_status,
+            "liveStatus": self.live_status,
+            "connectedSince": self.connected_since,
+            "clients": str(self.clients),
+            "sources": str(self.sources),
+            "targets": str(self.targets),
+            "problems": self.problems,
+        }
+        if self.error is not None:
+            result["error"] = str(self.error)
+        return result
+
+
+def connection_health(connection_id: str, status: dict[str, Any]) -> ConnectionHealth:
+    """Aggregate a `ConnectionStatus` document."""
+    health = ConnectionHealth(
+        connection_id,
+        connection_status=str(status.get("connectionStatus") or ""),
+        live_status=str(status.get("liveStatus") or ""),
+        connected_since=str(status.get("connectedSince") or ""),
+    )
+    for key, counts in (
+        ("clientStatus", health.clients),
+        ("sourceStatus", health.sources),
+        ("targetStatus", health.targets),
+    ):
+        for resource in status.get(key) or []:
+            counts.total += 1
+            if resource.get("status") == "open":
+                counts.open += 1
+                continue
+            name = resource.get("address") or resource.get("client") or "?"
+            details = resource.get("statusDetails")
+            problem = f"{resource.get('type', key)} '{name}' is {resource.get('status', 'unknown')}"
+            health.problems.append(f"{problem}: {details}" if details else problem)
+    return health
+
+
+async def iter_connection_status(
+    client: DittoClient,
+    connection_ids: Iterable[str],
+    concurrency: int = 16,
+) -> AsyncIterator[ConnectionHealth]:
+    """Fetch the status of many connections concurrently and yield each as soon as it arrives."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _fetch(connection_id: str) -> ConnectionHealth:
+        builder = client.api.two.connections.by_connection_id(connection_id).status
+        async with semaphore:
+            try:
+                status = await send_json(builder.request_adapter, builder.to_get_request_information())
+            except Exception as e:
+                return ConnectionHealth(connection_id, error=e)
+        return connection_health(connection_id, status or {})
+
+    tasks = [asyncio.ensure_future(_fetch(connection_id)) for connection_id in dict.fromkeys(connection_ids)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def fetch_connection_status(
+    client: DittoClient,
+    connection_ids: Iterable[str],
+    concurrency: int = 16,
+) -> list[ConnectionHealth]:
+    """Fetch the status of many connections concurrently, ordered by connection ID."""
+    results = [health async for health in iter_connection_status(client, connection_ids, concurrency)]
+    return sorted(results, key=lambda health: health.connection_id)
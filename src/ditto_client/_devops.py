@@ -0,0 +1,580 @@
+import asyncio
+import fnmatch
+import json
+import logging
+import os
+from collections import Counter
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from kiota_abstractions.api_error import APIError
+from kiota_abstractions.base_request_builder import BaseRequestBuilder
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+from kiota_abstractions.method import Method
+
+from ditto_client._concurrency import gather_bounded
+from ditto_client._properties import MISSING
+from ditto_client._raw import DEFAULT_ERROR_MAPPING, build_request, encode_json, send_json
+from ditto_client.generated.devops.config.config_request_builder import ConfigRequestBuilder
+from ditto_client.generated.devops.config.item.item.with_pod_name_item_request_builder import (
+    WithPodNameItemRequestBuilder,
+)
+from ditto_client.generated.devops.piggyback.item.item.with_instance_index_item_request_builder import (
+    WithInstanceIndexItemRequestBuilder,
+)
+from ditto_client.generated.devops.piggyback.item.with_service_name_item_request_builder import (
+    WithServiceNameItemRequestBuilder,
+)
+from ditto_client.generated.ditto_client import DittoClient
+
+logger = logging.getLogger(__name__)
+
+
+async def list_logging_modules(client: DittoClient) -> list[str]:
+    """Return the names of the modules (services) that report a logging configuration."""
+    builder = client.devops.logging
+    response = await send_json(builder.request_adapter, builder.to_get_request_information())
+    return sorted(response or {})
+
+
+async def resolve_modules(client: DittoClient, patterns: Iterable[str]) -> list[str]:
+    """Expand module names and glob patterns such as `things*` to module names.
+
+    The available modules are only requested when a pattern contains a wildcard.
+    """
+    patterns = list(patterns)
+    if not any(char in pattern for pattern in patterns for char in "*?["):
+        return list(dict.fromkeys(patterns))
+
+    available = await list_logging_modules(client)
+    modules: list[str] = []
+    for pattern in patterns:
+        matches = fnmatch.filter(available, pattern)
+        if not matches:
+            logger.warning("No module matches '%s'", pattern)
+        modules.extend(matches)
+    return list(dict.fromkeys(modules))
+
+
+@dataclass
+class PodLogLevel:
+    """The outcome of a log level change on one pod (instance) of a module."""
+
+    module: str
+    instance: str
+    status: int | None
+    successful: bool
+
+
+@dataclass
+class LogLevelUpdateReport:
+    """Per-pod outcome of a log level change across modules."""
+
+    logger_name: str
+    level: str
+    pods: list[PodLogLevel] = field(default_factory=list)
+    errors: dict[str, BaseException] = field(default_factory=dict)
+
+    @property
+    def successful(self) -> bool:
+        return not self.errors and all(pod.successful for pod in self.pods)
+
+    def to_dict(self) -> dict[str, Any]:
+        modules: dict[str, Any] = {}
+        for pod in self.pods:
+            modules.setdefault(pod.module, {})[pod.instance] = pod.status
+        return {
+            "logger": self.logger_name,
+            "level": self.level,
+            "pods": len(self.pods),
+            "failed": sum(1 for pod in self.pods if not pod.successful) + len(self.errors),
+            "modules": modules,
+            "errors": {module: str(error) for module, error in self.errors.items()},
+        }
+
+
+def _pod_results(module: str, response: Any) -> list[PodLogLevel]:
+    pods: list[PodLogLevel] = []
+    for instance, result in (response or {}).items():
+        if not isinstance(result, dict):
+            continue
+        status = result.get("status")
+        # The OpenAPI description misspells the flag as 'successfull'
+        successful = result.get("successful", result.get("successfull", status == 200))
+        pods.append(PodLogLevel(module, str(result.get("instance", instance)), status, bool(successful)))
+    return pods
+
+
+async def update_log_levels(
+    client: DittoClient,
+    modules: Iterable[str],
+    logger_name: str,
+    level: str,
+    concurrency: int = 16,
+) -> LogLevelUpdateReport:
+    """Change the level of a logger on all pods of many modules concurrently.
+
+    Args:
+        client: The Ditto client
+        modules: The module names, see `resolve_modules`
+        logger_name: The logger, e.g. `org.eclipse.ditto` or `ROOT`
+        level: The new level, e.g. `debug`
+        concurrency: Maximum number of concurrent requests
+    """
+    report = LogLevelUpdateReport(logger_name, level)
+
+    async def _update(module: str) -> None:
+        builder = client.devops.logging.by_module_name(module)
+        request_info = build_request(builder, Method.PUT, body={"logger": logger_name, "level": level})
+        try:
+            response = await send_json(builder.request_adapter, request_info)
+        except Exception as e:
+            logger.debug("Changing the log level of '%s' failed: %s", module, e)
+            report.errors[module] = e
+            return
+        report.pods.extend(_pod_results(module, response))
+
+    await gather_bounded((_update(module) for module in dict.fromkeys(modules)), concurrency)
+    report.pods.sort(key=lambda pod: (pod.module, pod.instance))
+    return report
+
+
+async def get_log_levels(
+    client: DittoClient,
+    modules: Iterable[str],
+    logger_name: str,
+    concurrency: int = 16,
+) -> dict[str, str | None]:
+    """Return the configured level of a logger per module.
+
+    When the pods of a module disagree the most common level is returned, and None when
+    the logger has no explicit level (it inherits the level of its parent) or the module
+    could not be read.
+    """
+
+    async def _get(module: str) -> str | None:
+        builder = client.devops.logging.by_module_name(module)
+        try:
+            response = await send_json(builder.request_adapter, builder.to_get_request_information())
+        except Exception as e:
+            logger.debug("Reading the log levels of '%s' failed: %s", module, e)
+            return None
+        levels = Counter(
+            str(config.get("level"))
+            for pod in (response or {}).values()
+            if isinstance(pod, dict)
+            for config in pod.get("loggerConfigs") or []
+            if config.get("logger") == logger_name and config.get("level")
+        )
+        return levels.most_common(1)[0][0] if levels else None
+
+    modules = list(dict.fromkeys(modules))
+    levels = await gather_bounded((_get(module) for module in modules), concurrency)
+    return dict(zip(modules, levels, strict=True))
+
+
+@asynccontextmanager
+async def log_level_override(
+    client: DittoClient,
+    modules: Iterable[str],
+    logger_name: str,
+    level: str,
+    default_level: str = "info",
+    concurrency: int = 16,
+) -> AsyncIterator[LogLevelUpdateReport]:
+    """Change the level of a logger for the duration of the block and restore it afterwards.
+
+    The previous level of every module is restored, also when the block is cancelled.
+    Modules where the logger had no explicit level are set to `default_level`.
+
+    ```python
+    async with log_level_override(client, ["gateway", "things"], "org.eclipse.ditto", "debug"):
+        await asyncio.sleep(600)
+    ```
+    """
+    modules = list(dict.fromkeys(modules))
+    previous = await get_log_levels(client, modules, logger_name, concurrency)
+    report = await update_log_levels(client, modules, logger_name, level, concurrency)
+    try:
+        yield report
+    finally:
+        by_level: dict[str, list[str]] = {}
+        for module in modules:
+            if module not in report.errors:
+                by_level.setdefault(previous.get(module) or default_level, []).append(module)
+        restored = await asyncio.gather(
+            *(
+                update_log_levels(client, restore_modules, logger_name, restore_level, concurrency)
+                for restore_level, restore_modules in by_level.items()
+            )
+        )
+        for result in restored:
+            if not result.successful:
+                logger.warning("Restoring log level '%s' failed: %s", result.level, result.to_dict())
+
+
+@dataclass(frozen=True)
+class PiggybackTarget:
+    """A service, or a single instance of a service, that receives a piggyback command."""
+
+    service: str
+    instance: str | None = None
+
+    @classmethod
+    def parse(cls, spec: str) -> list["PiggybackTarget"]:
+        """Parse `service`, `service:instance` or `service:first-last` into targets.
+
+        Raises:
+            ValueError: If the spec has no service or an invalid instance range
+        """
+        service, _, instances = spec.partition(":")
+        if not service:
+            raise ValueError(f"Missing the service in target '{spec}'")
+        if not instances:
+            return [cls(service)]
+        first, _, last = instances.partition("-")
+        if not last:
+            return [cls(service, first)]
+        if not (first.isdigit() and last.isdigit()) or int(first) > int(last):
+            raise ValueError(f"Invalid instance range '{instances}' in target '{spec}', expected e.g. '0-2'")
+        return [cls(service, str(index)) for index in range(int(first), int(last) + 1)]
+
+    def __str__(self) -> str:
+        return self.service if self.instance is None else f"{self.service}:{self.instance}"
+
+
+@dataclass
+class PiggybackResult:
+    """Outcome of a piggyback command sent to one target.
+
+    `status` is `ok`, `timeout` (no answer before the shared deadline) or `error`.
+    """
+
+    target: PiggybackTarget
+    status: str
+    response: Any = None
+    status_code: int | None = None
+    error: BaseException | None = None
+    elapsed: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "service": self.target.service,
+            "instance": self.target.instance,
+            "status": self.status,
+            "elapsed": round(self.elapsed, 3),
+        }
+        if self.status_code is not None:
+            result["statusCode"] = self.status_code
+        if self.response is not None:
+            result["response"] = self.response
+        if self.error is not None:
+            result["error"] = str(self.error)
+        return result
+
+
+def _decode_response(content: bytes | None) -> Any:
+    if not content:
+        return None
+    text = content.decode("utf-8", errors="replace")
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+async def run_piggyback(
+    client: DittoClient,
+    command: dict[str, Any],
+    targets: Iterable[PiggybackTarget],
+    timeout: float = 10.0,  # noqa: ASYNC109 - the deadline is shared by all targets, not a per-call timeout
+    concurrency: int = 32,
+) -> list[PiggybackResult]:
+    """Send the same piggyback command to many services or service instances concurrently.
+
+    All targets share one deadline of `timeout` seconds, which is also passed to Ditto as the
+    command timeout. Targets that did not answer in time get the status `timeout`. Results
+    are returned in the order of the targets.
+
+    Args:
+        client: The Ditto client
+        command: The piggyback command, with `targetActorSelection`, `headers` and `piggybackCommand`
+        targets: The services or service instances, see `PiggybackTarget.parse`
+        timeout: Seconds until the shared deadline
+        concurrency: Maximum number of concurrent requests
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    semaphore = asyncio.Semaphore(concurrency)
+    body = encode_json(command)
+
+    async def _send(target: PiggybackTarget) -> PiggybackResult:
+        async with semaphore:
+            started = loop.time()
+            remaining = int((deadline - started) * 1000)
+            if remaining <= 0:
+                return PiggybackResult(target, "timeout")
+
+            service = client.devops.piggyback.by_service_name(target.service)
+            builder: BaseRequestBuilder
+            query_params: Any
+            if target.instance is None:
+                builder = service
+                query_params = WithServiceNameItemRequestBuilder.WithServiceNameItemRequestBuilderPostQueryParameters(
+                    timeout=f"{remaining}ms"
+                )
+            else:
+                builder = service.by_instance_index(target.instance)
+                query_params = (
+                    WithInstanceIndexItemRequestBuilder.WithInstanceIndexItemRequestBuilderPostQueryParameters(
+                        timeout=f"{remaining}ms"
+                    )
+                )
+            request_info = build_request(
+                builder, Method.POST, RequestConfiguration(query_parameters=query_params), body
+            )
+            try:
+                content: bytes | None = await builder.request_adapter.send_primitive_async(
+                    request_info, "bytes", DEFAULT_ERROR_MAPPING
+                )
+            except APIError as e:
+                status = "timeout" if e.response_status_code in (408, 504) else "error"
+                return PiggybackResult(
+                    target, status, status_code=e.response_status_code, error=e, elapsed=loop.time() - started
+                )
+            except Exception as e:
+                return PiggybackResult(target, "error", error=e, elapsed=loop.time() - started)
+            return PiggybackResult(target, "ok", response=_decode_response(content), elapsed=loop.time() - started)
+
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        return []
+    tasks = [asyncio.ensure_future(_send(target)) for target in targets]
+    # Leave a little room for the responses of Ditto's own timeouts to arrive
+    done, pending = await asyncio.wait(tasks, timeout=timeout + 1)
+    for task in pending:
+        task.cancel()
+    return [
+        task.result() if task in done else PiggybackResult(target, "timeout", elapsed=timeout)
+        for target, task in zip(targets, tasks, strict=True)
+    ]
+
+
+def _pod_config(response: Any) -> Any:
+    # A pod answers with a retrieveConfig response, possibly wrapped in a list or keyed by instance
+    if isinstance(response, list) and response:
+        response = response[0]
+    if isinstance(response, dict) and "config" not in response and len(response) == 1:
+        (inner,) = response.values()
+        if isinstance(inner, dict) and "config" in inner:
+            response = inner
+    return response.get("config", response) if isinstance(response, dict) else response
+
+
+async def fetch_pod_configs(
+    client: DittoClient,
+    pods: Iterable[str] | None = None,
+    path: str | None = None,
+    concurrency: int = 16,
+) -> dict[str, Any]:
+    """Fetch the configuration of service pods, keyed by `module/pod`.
+
+    Without `pods` the configuration of all pods is retrieved with one aggregated request,
+    otherwise every `module/pod` is fetched concurrently.
+
+    Args:
+        client: The Ditto client
+        pods: The pods to fetch as `module/pod`, all pods if omitted
+        path: Only retrieve the configuration below this path, e.g. `ditto.gateway`
+        concurrency: Maximum number of concurrent requests
+    """
+    if pods is None:
+        builder = client.devops.config
+        query_params = ConfigRequestBuilder.ConfigRequestBuilderGetQueryParameters(path=path)
+        response = await send_json(
+            builder.request_adapter,
+            builder.to_get_request_information(RequestConfiguration(query_parameters=query_params)),
+        )
+        return {
+            f"{module}/{pod}": _pod_config(result)
+            for module, module_pods in sorted((response or {}).items())
+            if isinstance(module_pods, dict)
+            for pod, result in sorted(module_pods.items())
+        }
+
+    async def _fetch(key: str) -> Any:
+        module, _, pod = key.partition("/")
+        if not pod:
+            raise ValueError(f"'{key}' is not of the form 'module/pod'")
+        pod_builder = client.devops.config.by_module_name(module).by_pod_name(pod)
+        pod_params = WithPodNameItemRequestBuilder.WithPodNameItemRequestBuilderGetQueryParameters(path=path)
+        return _pod_config(
+            await send_json(
+                pod_builder.request_adapter,
+                pod_builder.to_get_request_information(RequestConfiguration(query_parameters=pod_params)),
+            )
+        )
+
+    keys = list(dict.fromkeys(pods))
+    configs = await gather_bounded((_fetch(key) for key in keys), concurrency)
+    return dict(zip(keys, configs, strict=True))
+
+
+@dataclass(frozen=True)
+class ConfigDelta:
+    """A configuration value that differs between two configurations.
+
+    `path` is the dotted configuration path; `left` or `right` is `MISSING` when the
+    value only exists on one side.
+    """
+
+    path: str
+    left: Any
+    right: Any
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {"path": self.path}
+        if self.left is not MISSING:
+            result["left"] = self.left
+        if self.right is not MISSING:
+            result["right"] = self.right
+        return result
+
+
+def _flatten(value: Any, prefix: str, into: dict[str, Any]) -> dict[str, Any]:
+    if isinstance(value, dict) and value:
+        for key, item in value.items():
+            _flatten(item, f"{prefix}.{key}" if prefix else str(key), into)
+    else:
+        into[prefix] = value
+    return into
+
+
+def diff_configs(left: Any, right: Any) -> list[ConfigDelta]:
+    """Compare two configurations and return only the values that differ, ordered by path."""
+    left_values, right_values = _flatten(left, "", {}), _flatten(right, "", {})
+    return [
+        ConfigDelta(path, left_values.get(path, MISSING), right_values.get(path, MISSING))
+        for path in sorted(left_values.keys() | right_values.keys())
+        if left_values.get(path, MISSING) != right_values.get(path, MISSING)
+    ]
+
+
+def select_config(config: Any, path: str, name: str = "the configuration") -> Any:
+    """Select the configuration below a dotted path, e.g. `ditto.things`.
+
+    Raises:
+        LookupError: If the path does not exist
+    """
+    for key in path.split("."):
+        if not isinstance(config, dict) or key not in config:
+            raise LookupError(f"'{path}' not found in {name}")
+        config = config[key]
+    return config
+
+
+def default_snapshot_directory() -> Path:
+    """The directory config snapshots are stored in by default."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "ditto-client" / "config"
+
+
+class ConfigSnapshotStore:
+    """Stores pod configurations on disk as `<module>/<pod>/<timestamp>.json`.
+
+    Timestamps are UTC with microseconds in the form `20240131T120000123456Z`, followed by
+    `-1`, `-2`, ... if a snapshot with the same timestamp exists, so they sort chronologically.
+    A snapshot remembers the configuration path it was taken below.
+    """
+
+    def __init__(self, directory: Path | None = None) -> None:
+        self.directory = directory or default_snapshot_directory()
+
+    def _pod_directory(self, pod: str) -> Path:
+        module, _, name = pod.partition("/")
+        return self.directory / module / name
+
+    def save(self, pod: str, config: Any, timestamp: str | None = None, path: str | None = None) -> str:
+        """Store the configuration of a `module/pod` below `path` and return the snapshot timestamp."""
+        directory = self._pod_directory(pod)
+        directory.mkdir(parents=True, exist_ok=True)
+        if timestamp is None:
+            timestamp = base = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+            # Never overwrite an earlier snapshot, the suffix keeps the timestamps in order
+            suffix = 0
+            while (directory / f"{timestamp}.json").exists():
+                suffix += 1
+                timestamp = f"{base}-{suffix}"
+        (directory / f"{timestamp}.json").write_text(json.dumps({"path": path, "config": config}, sort_keys=True))
+        return timestamp
+
+    def timestamps(self, pod: str) -> list[str]:
+        """The timestamps of the snapshots of a pod, oldest first."""
+        directory = self._pod_directory(pod)
+        return sorted(path.stem for path in directory.glob("*.json")) if directory.is_dir() else []
+
+    def load(self, pod: str, timestamp: str = "latest", path: str | None = None) -> Any:
+        """Load the configuration below `path` from a snapshot of a pod, the most recent one by default.
+
+        Raises:
+            LookupError: If there is no such snapshot, or it was taken below a path that does not contain `path`
+        """
+        if timestamp == "latest":
+            timestamps = self.timestamps(pod)
+            if not timestamps:
+                raise LookupError(f"No config snapshot of '{pod}'")
+            timestamp = timestamps[-1]
+        file = self._pod_directory(pod) / f"{timestamp}.json"
+        if not file.is_file():
+            raise LookupError(f"No config snapshot of '{pod}' at '{timestamp}'")
+        document = json.loads(file.read_text())
+        saved_path, config = document["path"], document["config"]
+
+        if path == saved_path:
+            return config
+        if path is not None and (saved_path is None or path.startswith(f"{saved_path}.")):
+            relative = path if saved_path is None else path[len(saved_path) + 1 :]
+            return select_config(config, relative, f"'{pod}@{timestamp}'")
+        raise LookupError(
+            f"The config snapshot '{pod}@{timestamp}' was taken below '{saved_path or ''}', not '{path or ''}'"
+        )
+
+
+def config_drift(configs: dict[str, Any]) -> dict[str, list[ConfigDelta]]:
+    """Compare every pod with the most common values among the pods of the same module.
+
+    Returns the differences per `module/pod`, leaving out pods without differences. `left`
+    of a delta is the common value; on a tie, the value of the first pod by name wins.
+    """
+    modules: dict[str, dict[str, dict[str, Any]]] = {}
+    for pod in sorted(configs):
+        modules.setdefault(pod.partition("/")[0], {})[pod] = _flatten(configs[pod], "", {})
+
+    drift: dict[str, list[ConfigDelta]] = {}
+    for pods in modules.values():
+        paths = sorted(set().union(*pods.values()))
+        common: dict[str, Any] = {}
+        for path in paths:
+            # Values are compared by their JSON form, as lists and objects are not hashable
+            votes = Counter(_config_key(values.get(path, MISSING)) for values in pods.values())
+            key = votes.most_common(1)[0][0]
+            common[path] = next(
+                values.get(path, MISSING) for values in pods.values() if _config_key(values.get(path, MISSING)) == key
+            )
+        for pod, values in pods.items():
+            deltas = [
+                ConfigDelta(path, common[path], values.get(path, MISSING))
+                for path in paths
+                if _config_key(values.get(path, MISSING)) != _config_key(common[path])
+            ]
+            if deltas:
+                drift[pod] = deltas
+    return drift
+
+
+def _config_key(value: Any) -> str | None:
+    return None if value is MISSING else json.dumps(value, sort_keys=True, default=str)
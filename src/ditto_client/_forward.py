@@ -0,0 +1,85 @@
+"""Entry point of the ditto-client script.
+
+Commands are forwarded to a daemon while DITTO_DAEMON_SOCKET is set, so only standard library modules are imported
+here; the CLI is imported when a command runs locally.
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+from pathlib import Path
+
+# Set to the socket of a daemon to run commands on it
+DAEMON_SOCKET_ENV = "DITTO_DAEMON_SOCKET"
+
+# Environment variables of global options, which are forwarded to the daemon
+ENV_OPTIONS = {
+    "DITTO_BASE_URL": "--base-url",
+    "DITTO_USERNAME": "--username",
+    "DITTO_PASSWORD": "--password",
+    "DITTO_PREAUTH_SUBJECT": "--preauth-subject",
+    "DITTO_JWT_TOKEN": "--jwt-token",
+}
+
+
+def default_socket_path() -> Path:
+    """The socket the daemon listens on by default."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "ditto-client.sock"
+    return Path(f"/tmp/ditto-client-{os.getuid()}.sock")
+
+
+def _peer_uid(sock: socket.socket, socket_path: str) -> int:
+    """The user the process listening on a connected socket runs as."""
+    if hasattr(socket, "SO_PEERCRED"):
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", creds)
+        return int(uid)
+    # Without peer credentials, trust the owner of the socket file, which only its owner may create or replace
+    return os.stat(socket_path).st_uid
+
+
+def forward(socket_path: str, argv: list[str]) -> int | None:
+    """Run a command line on a daemon and write its output, returning None if the daemon is not reachable."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        uid = _peer_uid(sock, socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    with sock, sock.makefile("rb") as reader:
+        # The credentials in the environment are sent along, so only to a daemon of the same user
+        if uid != os.getuid():
+            sys.stderr.write(f"[ERROR] The daemon on {socket_path} is run by another user (uid {uid})\n")
+            return 1
+        env = {name: value for name, value in os.environ.items() if name in ENV_OPTIONS}
+        sock.sendall(json.dumps({"argv": argv, "env": env, "cwd": os.getcwd()}).encode("utf-8") + b"\n")
+        for line in reader:
+            frame = json.loads(line)
+            if "out" in frame:
+                sys.stdout.write(frame["out"])
+                sys.stdout.flush()
+            if "err" in frame:
+                sys.stderr.write(frame["err"])
+            if "exit" in frame:
+                return int(frame["exit"])
+    sys.stderr.write("[ERROR] Connection to the daemon was lost\n")
+    return 1
+
+
+def run() -> None:
+    """Run the CLI, forwarding the command to a daemon if DITTO_DAEMON_SOCKET is set."""
+    socket_path = os.environ.get(DAEMON_SOCKET_ENV)
+    if socket_path:
+        code = forward(socket_path, sys.argv[1:])
+        if code is not None:
+            sys.exit(code)
+
+    from ditto_client.__main__ import cli_app
+
+    cli_app()
@@ -0,0 +1,321 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any
+
+from kiota_abstractions.api_error import APIError
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+from kiota_abstractions.method import Method
+from kiota_abstractions.serialization import ParsableFactory
+
+from ditto_client._raw import DEFAULT_ERROR_MAPPING, build_request, send_no_content
+from ditto_client.generated.api.two.things.item.inbox.messages.item.with_message_subject_item_request_builder import (
+    WithMessageSubjectItemRequestBuilder,
+)
+from ditto_client.generated.ditto_client import DittoClient
+from ditto_client.generated.models.with_message_subject424_error import WithMessageSubject424Error
+
+logger = logging.getLogger(__name__)
+
+# Ditto rejects message timeouts above 60 seconds
+MAX_MESSAGE_TIMEOUT = 60
+
+
+@dataclass
+class DispatchFailure:
+    """A message that could not be delivered to Ditto."""
+
+    thing_id: str
+    subject: str
+    error: BaseException
+
+
+@dataclass
+class DispatchReport:
+    """Outcome of the messages sent by a `MessageDispatcher`."""
+
+    sent: int = 0
+    failures: list[DispatchFailure] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Messages per second, including failed ones."""
+        total = self.sent + len(self.failures)
+        return total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "failed": len(self.failures),
+            "elapsed": round(self.elapsed, 3),
+            "throughput": round(self.throughput, 1),
+            "failures": [
+                {"thingId": failure.thing_id, "subject": failure.subject, "error": str(failure.error)}
+                for failure in self.failures
+            ],
+        }
+
+
+@dataclass
+class _Message:
+    subject: str
+    payload: bytes
+    content_type: str
+
+
+class MessageDispatcher:
+    """Sends fire-and-forget messages to thing inboxes with bounded concurrency.
+
+    Messages are posted with `timeout=0`, so Ditto acknowledges them as soon as they are
+    accepted instead of waiting for the device to answer. Messages to the same thing are
+    sent one after another in the order they were queued, while different things are
+    served in parallel with at most `concurrency` requests in flight.
+
+    ```python
+    async with MessageDispatcher(client, concurrency=128) as dispatcher:
+        for thing_id in thing_ids:
+            dispatcher.send(thing_id, "reboot", b"{}", "application/json")
+    print(dispatcher.report.to_dict())
+    ```
+    """
+
+    def __init__(
+        self,
+        client: DittoClient,
+        concurrency: int = 64,
+        content_type: str = "application/octet-stream",
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self._client = client
+        self._content_type = content_type
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._queues: dict[str, deque[_Message]] = {}
+        self._workers: set[asyncio.Task[None]] = set()
+        self._started: float | None = None
+        self.report = DispatchReport()
+
+    def send(self, thing_id: str, subject: str, payload: bytes | str, content_type: str | None = None) -> None:
+        """Queue a message for a thing's inbox without waiting for it to be sent.
+
+        `bytes` payloads are sent unchanged; `str` payloads are UTF-8 encoded once.
+        """
+        if self._started is None:
+            self._started = time.perf_counter()
+
+        data = payload.encode("utf-8") if isinstance(payload, str) else payload
+        message = _Message(subject, data, content_type or self._content_type)
+
+        queue = self._queues.get(thing_id)
+        if queue is not None:
+            queue.append(message)
+            return
+
+        self._queues[thing_id] = deque([message])
+        worker = asyncio.ensure_future(self._drain_thing(thing_id))
+        self._workers.add(worker)
+        worker.add_done_callback(self._workers.discard)
+
+    async def _post(self, thing_id: str, message: _Message) -> None:
+        builder = self._client.api.two.things.by_thing_id(thing_id).inbox.messages.by_message_subject(message.subject)
+        query_params = WithMessageSubjectItemRequestBuilder.WithMessageSubjectItemRequestBuilderPostQueryParameters(
+            timeout=0,
+        )
+        request_info = build_request(
+            builder,
+            Method.POST,
+            RequestConfiguration(query_parameters=query_params),
+            body=message.payload,
+            content_type=message.content_type,
+        )
+        await send_no_content(builder.request_adapter, request_info)
+
+    async def _drain_thing(self, thing_id: str) -> None:
+        queue = self._queues[thing_id]
+        try:
+            while queue:
+                message = queue.popleft()
+                async with self._semaphore:
+                    try:
+                        await self._post(thing_id, message)
+                    except Exception as e:
+                        logger.debug("Sending '%s' to '%s' failed: %s", message.subject, thing_id, e)
+                        self.report.failures.append(DispatchFailure(thing_id, message.subject, e))
+                    else:
+                        self.report.sent += 1
+        finally:
+            del self._queues[thing_id]
+
+    async def drain(self) -> DispatchReport:
+        """Wait until all queued messages have been sent and return the report."""
+        while self._workers:
+            await asyncio.gather(*self._workers)
+        if self._started is not None:
+            self.report.elapsed = time.perf_counter() - self._started
+        return self.report
+
+    async def __aenter__(self) -> "MessageDispatcher":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.drain()
+
+
+async def broadcast(
+    client: DittoClient,
+    thing_ids: list[str],
+    subject: str,
+    payload: bytes | str,
+    content_type: str = "application/octet-stream",
+    concurrency: int = 64,
+) -> DispatchReport:
+    """Send the same fire-and-forget message to many things."""
+    async with MessageDispatcher(client, concurrency=concurrency, content_type=content_type) as dispatcher:
+        for thing_id in thing_ids:
+            dispatcher.send(thing_id, subject, payload)
+    return dispatcher.report
+
+
+_CALL_ERROR_MAPPING: dict[str, type[ParsableFactory[Any]]] = {
+    **DEFAULT_ERROR_MAPPING,
+    "424": WithMessageSubject424Error,
+}
+
+
+@dataclass
+class CallResult:
+    """Outcome of a single request/response message exchange with a thing.
+
+    `status` is one of:
+
+    * `ok` - the device answered, `payload` holds the response body
+    * `timeout` - no answer before the global deadline
+    * `device_timeout` - Ditto answered with 408 because the device did not respond in time
+    * `ack_failed` - Ditto answered with 424 because requested acknowledgements failed
+    * `error` - any other failure, see `error`
+    """
+
+    thing_id: str
+    status: str
+    payload: bytes | None = None
+    status_code: int | None = None
+    error: BaseException | None = None
+    elapsed: float = 0.0
+
+    def json(self) -> Any:
+        """Decode the response payload as JSON."""
+        return json.loads(self.payload) if self.payload else None
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {"thingId": self.thing_id, "status": self.status, "elapsed": round(self.elapsed, 3)}
+        if self.status_code is not None:
+            result["statusCode"] = self.status_code
+        if self.payload is not None:
+            result["payload"] = self.payload.decode("utf-8", errors="replace")
+        if self.error is not None:
+            result["error"] = str(self.error)
+        return result
+
+
+async def call_many(
+    client: DittoClient,
+    targets: Iterable[str],
+    subject: str,
+    payload: bytes | str,
+    timeout: float = 10.0,  # noqa: ASYNC109 - the deadline is shared by all calls, not a per-call timeout
+    content_type: str = "application/json",
+    concurrency: int = 256,
+) -> AsyncIterator[CallResult]:
+    """Send the same request message to many things and yield the results as they complete.
+
+    All calls share one deadline of `timeout` seconds; the remaining time is passed to Ditto
+    as the message `timeout` so the whole fan-out finishes within a single timeout window.
+    Calls that could not complete before the deadline are yielded last with status `timeout`.
+    Ditto accepts message timeouts of up to 60 seconds, so `timeout` must not exceed that.
+
+    ```python
+    async for result in call_many(client, thing_ids, "diagnose", b"{}", timeout=5):
+        print(result.thing_id, result.status, result.json() if result.status == "ok" else None)
+    ```
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if not 0 < timeout <= MAX_MESSAGE_TIMEOUT:
+        raise ValueError(f"timeout must be between 0 and {MAX_MESSAGE_TIMEOUT} seconds")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    semaphore = asyncio.Semaphore(concurrency)
+    data = payload.encode("utf-8") if isinstance(payload, str) else payload
+
+    async def _call(thing_id: str) -> CallResult:
+        async with semaphore:
+            started = loop.time()
+            if started >= deadline:
+                return CallResult(thing_id, "timeout")
+            # Ditto takes whole seconds and treats 0 as fire and forget, so round up; the shared
+            # deadline is still enforced here
+            remaining = math.ceil(deadline - started)
+
+            builder = client.api.two.things.by_thing_id(thing_id).inbox.messages.by_message_subject(subject)
+            query_params = WithMessageSubjectItemRequestBuilder.WithMessageSubjectItemRequestBuilderPostQueryParameters(
+                timeout=remaining,
+            )
+            request_info = build_request(
+                builder,
+                Method.POST,
+                RequestConfiguration(query_parameters=query_params),
+                body=data,
+                content_type=content_type,
+            )
+            try:
+                response: bytes | None = await builder.request_adapter.send_primitive_async(
+                    request_info, "bytes", _CALL_ERROR_MAPPING
+                )
+            except WithMessageSubject424Error as e:
+                return CallResult(thing_id, "ack_failed", status_code=424, error=e, elapsed=loop.time() - started)
+            except APIError as e:
+                status = "device_timeout" if e.response_status_code == 408 else "error"
+                return CallResult(
+                    thing_id, status, status_code=e.response_status_code, error=e, elapsed=loop.time() - started
+                )
+            except Exception as e:
+                return CallResult(thing_id, "error", error=e, elapsed=loop.time() - started)
+
+            return CallResult(thing_id, "ok", payload=response, elapsed=loop.time() - started)
+
+    tasks: dict[asyncio.Future[CallResult], str] = {
+        asyncio.ensure_future(_call(thing_id)): thing_id for thing_id in dict.fromkeys(targets)
+    }
+    pending: set[asyncio.Future[CallResult]] = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(deadline - loop.time(), 0),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for task in done:
+                yield task.result()
+
+        for task in pending:
+            task.cancel()
+            yield CallResult(tasks[task], "timeout", elapsed=timeout)
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from ditto_client.generated.ditto_client import DittoClient
+from ditto_client.generated.models.permission_check_request import PermissionCheckRequest
+
+# (subjects, entity id, resource, permissions)
+_Key = tuple[frozenset[str], str, str, tuple[str, ...]]
+
+
+class PermissionChecker:
+    """Cached and batched access to `/api/2/checkPermissions`.
+
+    Results are cached per (subject set, entity, resource, permissions) for `ttl` seconds,
+    keeping at most `max_entries` results (least recently used are evicted first). Checks
+    that are not cached and arrive within `window` seconds of each other are merged into a
+    single request with up to `max_batch` entries, and concurrent checks for the same key
+    share one request.
+
+    The subject set is the one of the authenticated caller, taken from `/whoami` on first
+    use unless given explicitly.
+    """
+
+    def __init__(
+        self,
+        client: DittoClient,
+        ttl: float = 30.0,
+        max_entries: int = 10_000,
+        max_batch: int = 100,
+        window: float = 0.002,
+        subjects: Iterable[str] | None = None,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+
+        self._client = client
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_batch = max_batch
+        self._window = window
+        self._subjects = frozenset(subjects) if subjects is not None else None
+        self._subjects_lock = asyncio.Lock()
+
+        self._cache: OrderedDict[_Key, tuple[float, bool]] = OrderedDict()
+        self._in_flight: dict[_Key, asyncio.Future[bool]] = {}
+        self._queue: list[_Key] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def _get_subjects(self) -> frozenset[str]:
+        if self._subjects is None:
+            async with self._subjects_lock:
+                if self._subjects is None:
+                    response = await self._client.api.two.whoami.get()
+                    self._subjects = frozenset(response.subjects or []) if response else frozenset()
+        return self._subjects
+
+    def _cached(self, key: _Key) -> bool | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, allowed = entry
+        if expires < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return allowed
+
+    def _store(self, key: _Key, allowed: bool) -> None:
+        self._cache[key] = (time.monotonic() + self._ttl, allowed)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+    async def check(self, entity_id: str, resource: str, permissions: Iterable[str]) -> bool:
+        """Check whether the caller has all `permissions` (e.g. `READ`, `WRITE`) on a resource.
+
+        Args:
+            entity_id: The thing or policy ID
+            resource: The resource key, e.g. `thing:/features/lamp/properties/on`
+            permissions: The required permissions
+        """
+        subjects = await self._get_subjects()
+        key: _Key = (subjects, entity_id, resource, tuple(sorted({p.upper() for p in permissions})))
+
+        allowed = self._cached(key)
+        if allowed is not None:
+            return allowed
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[key] = future
+            self._queue.append(key)
+            if len(self._queue) >= self._max_batch:
+                self._start_flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self._window, self._start_flush)
+
+        return await asyncio.shield(future)
+
+    async def check_many(self, checks: Iterable[tuple[str, str, Iterable[str]]]) -> list[bool]:
+        """Run many `(entity_id, resource, permissions)` checks, merged into as few requests as possible."""
+        return list(await asyncio.gather(*(self.check(*check) for check in checks)))
+
+    def invalidate(self, entity_id: str | None = None) -> None:
+        """Drop cached results, either all or only those of one entity."""
+        if entity_id is None:
+            self._cache.clear()
+            return
+        for key in [key for key in self._cache if key[1] == entity_id]:
+            del self._cache[key]
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._queue:
+            batch, self._queue = self._queue[: self._max_batch], self._queue[self._max_batch :]
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[_Key]) -> None:
+        labels = {f"check{index}": key for index, key in enumerate(batch)}
+        request_data: dict[str, Any] = {
+            label: {"resource": resource, "entityId": entity_id, "hasPermissions": list(permissions)}
+            for label, (_, entity_id, resource, permissions) in labels.items()
+        }
+
+        try:
+            response = await self._client.api.two.check_permissions.post(
+                body=PermissionCheckRequest(additional_data=request_data),
+            )
+            results = response.additional_data if response else {}
+        except Exception as e:
+            for key in batch:
+                future = self._in_flight.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for label, key in labels.items():
+            allowed = results.get(label) is True
+            self._store(key, allowed)
+            future = self._in_flight.pop(key)
+            if not future.done():
+                future.set_result(allowed)
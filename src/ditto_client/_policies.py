@@ -0,0 +1,453 @@
+import copy
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from kiota_abstractions.api_error import APIError
+from kiota_abstractions.base_request_builder import BaseRequestBuilder
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+from kiota_abstractions.method import Method
+
+from ditto_client._concurrency import gather_bounded
+from ditto_client._raw import build_request, encode_json, send_json, send_no_content
+from ditto_client._write_planner import DEFAULT_REQUEST_OVERHEAD
+from ditto_client.generated.api.two.policies.item.with_policy_item_request_builder import WithPolicyItemRequestBuilder
+from ditto_client.generated.ditto_client import DittoClient
+
+logger = logging.getLogger(__name__)
+
+# The parts of a policy that are written by a PUT and compared when planning
+_POLICY_CONTENT = ("entries", "imports")
+
+
+def load_policy_documents(directory: Path) -> dict[str, dict[str, Any]]:
+    """Load the desired policies from the `*.json` files of a directory.
+
+    A file contains either a complete policy (an object with `entries`) or only its entries,
+    like the file passed to `policy create`. The policy ID is taken from `policyId` if present,
+    otherwise from the file name without the extension.
+    """
+    policies: dict[str, dict[str, Any]] = {}
+    for path in sorted(directory.glob("*.json")):
+        document = json.loads(path.read_text())
+        if not isinstance(document, dict):
+            raise ValueError(f"'{path}' does not contain a JSON object")
+
+        policy_id = str(document.get("policyId", path.stem))
+        if policy_id in policies:
+            raise ValueError(f"Policy '{policy_id}' is defined more than once ('{path}')")
+        policies[policy_id] = policy_content(document)
+    return policies
+
+
+def policy_content(document: dict[str, Any]) -> dict[str, Any]:
+    """Return the `entries` and `imports` of a policy document.
+
+    A document without `entries` is taken to be the entries themselves.
+    """
+    if "entries" not in document:
+        return {"entries": document}
+    return {key: document[key] for key in _POLICY_CONTENT if key in document}
+
+
+def policy_hash(policy: Mapping[str, Any]) -> str:
+    """Hash the content of a policy independent of key order and formatting.
+
+    Only `entries` and `imports` are hashed, a missing `imports` counts as empty.
+    """
+    content = {key: policy.get(key) or {} for key in _POLICY_CONTENT}
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PolicyChange:
+    """The planned and, once applied, actual outcome for one policy.
+
+    `action` is `create`, `update`, `unchanged` or `error` (the current policy could not
+    be read). `status` is `planned` until the change is applied, then `applied`, `conflict`
+    (the policy was modified concurrently) or `failed`.
+    """
+
+    policy_id: str
+    action: str
+    document: dict[str, Any]
+    revision: int | None = None
+    status: str = "planned"
+    error: BaseException | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {"policyId": self.policy_id, "action": self.action, "status": self.status}
+        if self.revision is not None:
+            result["revision"] = self.revision
+        if self.error is not None:
+            result["error"] = str(self.error)
+        return result
+
+
+@dataclass
+class PolicyApplyReport:
+    """Outcome of a bulk policy apply."""
+
+    changes: list[PolicyChange] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def count(self, action: str | None = None, status: str | None = None) -> int:
+        return sum(
+            1
+            for change in self.changes
+            if (action is None or change.action == action) and (status is None or change.status == status)
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "created": self.count("create", "applied"),
+            "updated": self.count("update", "applied"),
+            "unchanged": self.count("unchanged"),
+            "planned": self.count(status="planned") - self.count("unchanged"),
+            "conflicts": self.count(status="conflict"),
+            "failed": self.count(status="failed"),
+            "elapsed": round(self.elapsed, 3),
+            "policies": [change.to_dict() for change in self.changes if change.action != "unchanged"],
+        }
+
+
+async def _plan_policy(client: DittoClient, policy_id: str, document: dict[str, Any]) -> PolicyChange:
+    builder = client.api.two.policies.by_policy_id(policy_id)
+    query_params = WithPolicyItemRequestBuilder.WithPolicyItemRequestBuilderGetQueryParameters()
+    query_params.fields = ",".join((*_POLICY_CONTENT, "_revision"))
+    request_info = builder.to_get_request_information(RequestConfiguration(query_parameters=query_params))
+
+    try:
+        current = await send_json(builder.request_adapter, request_info) or {}
+    except APIError as e:
+        if e.response_status_code == 404:
+            return PolicyChange(policy_id, "create", document)
+        logger.debug("Reading policy '%s' failed: %s", policy_id, e)
+        return PolicyChange(policy_id, "error", document, status="failed", error=e)
+
+    revision = current.get("_revision")
+    action = "unchanged" if policy_hash(current) == policy_hash(document) else "update"
+    return PolicyChange(policy_id, action, document, revision=revision)
+
+
+async def plan_policies(
+    client: DittoClient,
+    policies: Mapping[str, dict[str, Any]],
+    concurrency: int = 16,
+) -> list[PolicyChange]:
+    """Compare desired policies with the current ones and plan which need to be written.
+
+    The current policies are read concurrently, with only their entries, imports and revision
+    selected, and compared by `policy_hash`.
+
+    Args:
+        client: The Ditto client
+        policies: The desired policies by policy ID, see `load_policy_documents`
+        concurrency: Maximum number of concurrent requests
+    """
+    return await gather_bounded(
+        (_plan_policy(client, policy_id, document) for policy_id, document in policies.items()),
+        concurrency,
+    )
+
+
+async def _put_policy(client: DittoClient, change: PolicyChange) -> None:
+    builder = client.api.two.policies.by_policy_id(change.policy_id)
+    request_info = build_request(builder, Method.PUT, body=change.document)
+    # Only write the revision the plan was made against, and never overwrite a policy created meanwhile
+    if change.action == "update" and change.revision is not None:
+        request_info.headers.add("If-Match", f'"rev:{change.revision}"')
+    else:
+        request_info.headers.add("If-None-Match", "*")
+
+    try:
+        await send_no_content(builder.request_adapter, request_info)
+    except APIError as e:
+        change.status = "conflict" if e.response_status_code == 412 else "failed"
+        change.error = e
+        logger.debug("Writing policy '%s' failed: %s", change.policy_id, e)
+    except Exception as e:
+        change.status = "failed"
+        change.error = e
+        logger.debug("Writing policy '%s' failed: %s", change.policy_id, e)
+    else:
+        change.status = "applied"
+
+
+async def apply_policies(
+    client: DittoClient,
+    changes: Iterable[PolicyChange],
+    concurrency: int = 16,
+) -> PolicyApplyReport:
+    """Write the created and updated policies of a plan.
+
+    Updates are conditional on the planned revision (`If-Match`) and creations on the
+    policy not existing yet (`If-None-Match: *`), so policies changed since planning are
+    reported as conflicts instead of being overwritten.
+    """
+    report = PolicyApplyReport(changes=list(changes))
+    started = time.perf_counter()
+    await gather_bounded(
+        (_put_policy(client, change) for change in report.changes if change.action in ("create", "update")),
+        concurrency,
+    )
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+async def sync_policies(
+    client: DittoClient,
+    policies: Mapping[str, dict[str, Any]],
+    concurrency: int = 16,
+    dry_run: bool = False,
+) -> PolicyApplyReport:
+    """Plan and apply desired policies, writing only those that differ from the current ones."""
+    started = time.perf_counter()
+    changes = await plan_policies(client, policies, concurrency)
+    if dry_run:
+        report = PolicyApplyReport(changes=changes)
+    else:
+        report = await apply_policies(client, changes, concurrency)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+@dataclass(frozen=True)
+class PolicyWrite:
+    """A single write against a policy or one of its entries.
+
+    Without `label` the write replaces the whole policy. With `subject_id` or `resource`
+    it addresses a single subject or resource of the entry `label`.
+    """
+
+    method: str
+    label: str | None = None
+    subject_id: str | None = None
+    resource: str | None = None
+    value: Any = None
+
+    @property
+    def path(self) -> str:
+        if self.label is None:
+            return ""
+        if self.subject_id is not None:
+            return f"/entries/{self.label}/subjects/{self.subject_id}"
+        if self.resource is not None:
+            return f"/entries/{self.label}/resources/{self.resource}"
+        return f"/entries/{self.label}"
+
+    def to_dict(self) -> dict[str, Any]:
+        if self.method == "DELETE":
+            return {"method": self.method, "path": self.path}
+        return {"method": self.method, "path": self.path, "value": self.value}
+
+
+def _write_cost(write: PolicyWrite, request_overhead: int) -> int:
+    size = request_overhead + len(write.path)
+    if write.method != "DELETE":
+        size += len(encode_json(write.value))
+    return size
+
+
+def _diff_section(label: str, section: str, current: dict[str, Any], desired: dict[str, Any]) -> list[PolicyWrite]:
+    def _write(method: str, key: str, value: Any = None) -> PolicyWrite:
+        if section == "subjects":
+            return PolicyWrite(method, label, subject_id=key, value=value)
+        return PolicyWrite(method, label, resource=key, value=value)
+
+    writes = [_write("PUT", key, value) for key, value in desired.items() if current.get(key) != value]
+    writes.extend(_write("DELETE", key) for key in current.keys() - desired.keys())
+    return writes
+
+
+def _diff_entry(
+    label: str, current: dict[str, Any], desired: dict[str, Any], request_overhead: int
+) -> list[PolicyWrite]:
+    replace = [PolicyWrite("PUT", label, value=desired)]
+
+    other_keys = (current.keys() | desired.keys()) - {"subjects", "resources"}
+    if any(current.get(key) != desired.get(key) for key in other_keys):
+        return replace
+
+    writes: list[PolicyWrite] = []
+    for section in ("subjects", "resources"):
+        current_section, desired_section = current.get(section) or {}, desired.get(section) or {}
+        if not isinstance(current_section, dict) or not isinstance(desired_section, dict):
+            return replace
+        writes.extend(_diff_section(label, section, current_section, desired_section))
+
+    if sum(_write_cost(write, request_overhead) for write in writes) > _write_cost(replace[0], request_overhead):
+        return replace
+    return writes
+
+
+def plan_policy_writes(
+    current: dict[str, Any],
+    desired: dict[str, Any],
+    request_overhead: int = DEFAULT_REQUEST_OVERHEAD,
+) -> list[PolicyWrite]:
+    """Plan the writes that turn the current policy into the desired one.
+
+    Changed subjects and resources of existing entries are written individually, new or
+    otherwise changed entries are written whole and removed entries are deleted. When the
+    targeted writes, including `request_overhead` per request, would be larger than the
+    policy itself, or the imports changed, the plan is a single `PUT` of the policy.
+
+    Args:
+        current: The current policy, at least its `entries`
+        desired: The desired policy, see `policy_content`
+        request_overhead: Estimated size in bytes of an additional request
+    """
+    current_entries = current.get("entries") or {}
+    desired_entries = desired.get("entries") or {}
+
+    document = {"entries": desired_entries}
+    imports = desired.get("imports", current.get("imports"))
+    if imports:
+        document["imports"] = imports
+    replace = [PolicyWrite("PUT", value=document)]
+
+    if "imports" in desired and (desired["imports"] or {}) != (current.get("imports") or {}):
+        return replace
+
+    writes: list[PolicyWrite] = []
+    for label, entry in desired_entries.items():
+        existing = current_entries.get(label)
+        if existing == entry:
+            continue
+        if isinstance(existing, dict) and isinstance(entry, dict):
+            writes.extend(_diff_entry(label, existing, entry, request_overhead))
+        else:
+            writes.append(PolicyWrite("PUT", label, value=entry))
+    writes.extend(PolicyWrite("DELETE", label) for label in current_entries.keys() - desired_entries.keys())
+
+    if sum(_write_cost(write, request_overhead) for write in writes) > _write_cost(replace[0], request_overhead):
+        return replace
+    return writes
+
+
+async def _fetch_policy_content(client: DittoClient, policy_id: str) -> dict[str, Any]:
+    builder = client.api.two.policies.by_policy_id(policy_id)
+    query_params = WithPolicyItemRequestBuilder.WithPolicyItemRequestBuilderGetQueryParameters()
+    query_params.fields = ",".join(_POLICY_CONTENT)
+    request_info = builder.to_get_request_information(RequestConfiguration(query_parameters=query_params))
+    return await send_json(builder.request_adapter, request_info) or {}
+
+
+async def plan_policy_update(
+    client: DittoClient,
+    policy_id: str,
+    desired: dict[str, Any],
+    current: dict[str, Any] | None = None,
+    request_overhead: int = DEFAULT_REQUEST_OVERHEAD,
+) -> list[PolicyWrite]:
+    """Plan the writes for a policy update, fetching the current entries and imports if needed.
+
+    When the policy does not exist yet, the plan is a single `PUT` of the desired policy.
+    See `plan_policy_writes` for the planning rules.
+    """
+    if current is None:
+        try:
+            current = await _fetch_policy_content(client, policy_id)
+        except APIError as e:
+            if e.response_status_code != 404:
+                raise
+            return [PolicyWrite("PUT", value=desired)]
+
+    return plan_policy_writes(current, desired, request_overhead)
+
+
+def _policy_write_builder(client: DittoClient, policy_id: str, write: PolicyWrite) -> BaseRequestBuilder:
+    policy = client.api.two.policies.by_policy_id(policy_id)
+    if write.label is None:
+        return policy
+
+    entry = policy.entries.by_label(write.label)
+    if write.subject_id is not None:
+        return entry.subjects.by_subject_id(write.subject_id)
+    if write.resource is not None:
+        return entry.resources.by_resource_path(write.resource)
+    return entry
+
+
+async def apply_policy_writes(
+    client: DittoClient,
+    policy_id: str,
+    writes: Iterable[PolicyWrite],
+    concurrency: int = 8,
+) -> None:
+    """Execute planned policy writes concurrently.
+
+    All `PUT`s are sent before any `DELETE`, so a subject that replaces another one is
+    granted its permissions before the old one loses them.
+    """
+
+    async def _apply(write: PolicyWrite) -> None:
+        builder = _policy_write_builder(client, policy_id, write)
+        if write.method == "DELETE":
+            request_info = build_request(builder, Method.DELETE)
+        else:
+            request_info = build_request(builder, Method.PUT, body=write.value)
+        await send_no_content(builder.request_adapter, request_info)
+
+    writes = list(writes)
+    for method in ("PUT", "DELETE"):
+        await gather_bounded((_apply(write) for write in writes if write.method == method), concurrency)
+
+
+class PolicyEditor:
+    """Edits a policy as a plain JSON document and writes back only what changed.
+
+    ```python
+    async with PolicyEditor(client, "my.sensors:sensor-policy") as policy:
+        policy["entries"]["OPERATORS"]["subjects"]["nginx:alice"] = {"type": "operator"}
+    ```
+
+    The changes are written when the block exits without an error, see `plan_policy_writes`.
+    """
+
+    def __init__(
+        self,
+        client: DittoClient,
+        policy_id: str,
+        concurrency: int = 8,
+        request_overhead: int = DEFAULT_REQUEST_OVERHEAD,
+    ) -> None:
+        self._client = client
+        self._policy_id = policy_id
+        self._concurrency = concurrency
+        self._request_overhead = request_overhead
+        self._loaded: dict[str, Any] = {}
+        self.policy: dict[str, Any] = {}
+
+    async def load(self) -> dict[str, Any]:
+        """Read the entries and imports of the policy, discarding unsaved changes."""
+        self._loaded = await _fetch_policy_content(self._client, self._policy_id)
+        self.policy = copy.deepcopy(self._loaded)
+        return self.policy
+
+    async def save(self) -> list[PolicyWrite]:
+        """Write the changes made since the last load or save and return the writes."""
+        writes = plan_policy_writes(self._loaded, self.policy, self._request_overhead)
+        await apply_policy_writes(self._client, self._policy_id, writes, self._concurrency)
+        self._loaded = copy.deepcopy(self.policy)
+        return writes
+
+    async def __aenter__(self) -> dict[str, Any]:
+        return await self.load()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            await self.save()
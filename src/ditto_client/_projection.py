@@ -0,0 +1,264 @@
+import json
+import logging
+import sys
+from collections.abc import Awaitable, Iterable
+from pathlib import Path
+from typing import Any, cast
+
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+from kiota_abstractions.serialization import Parsable
+
+from ditto_client.generated.api.two.things.item.with_thing_item_request_builder import WithThingItemRequestBuilder
+from ditto_client.generated.ditto_client import DittoClient
+from ditto_client.generated.models.thing import Thing
+
+logger = logging.getLogger(__name__)
+
+# Model attributes whose JSON name differs from the Python name
+_FIELD_NAMES = {"thing_id": "thingId", "policy_id": "policyId", "desired_properties": "desiredProperties"}
+
+
+def _join(prefix: str, name: str) -> str:
+    return f"{prefix}/{name}" if prefix else name
+
+
+def _covers(selector: Iterable[str], path: str) -> bool:
+    """Whether a path is included in a fields selector. The empty path (the whole thing) never is."""
+    return any(path == field or path.startswith(f"{field}/") for field in selector) if path else False
+
+
+def minimal_fields(paths: Iterable[str]) -> list[str]:
+    """Reduce paths to the shortest list that selects all of them, dropping paths within other paths.
+
+    Returns an empty list when the whole thing (the empty path) is needed.
+    """
+    fields: list[str] = []
+    for path in sorted(set(paths)):
+        if not path:
+            return []
+        if not _covers(fields, path):
+            fields.append(path)
+    return fields
+
+
+class _Recording:
+    """The paths of a thing read at one call site."""
+
+    def __init__(self) -> None:
+        # Values that were read, or used as a whole
+        self.used: set[str] = set()
+        # Objects that were only navigated into
+        self.navigated: set[str] = set()
+
+    def use(self, path: str) -> None:
+        self.used.add(path)
+
+    def navigate(self, path: str) -> None:
+        self.navigated.add(path)
+
+    def paths(self) -> set[str]:
+        # An object that was navigated into without reading anything from it may have been used as a whole
+        paths = set(self.used)
+        for path in self.navigated:
+            if not any(_covers([path], other) and other != path for other in self.used | self.navigated):
+                paths.add(path)
+        return paths
+
+
+class _RecordingDict(dict[str, Any]):
+    """A dict that records which of its keys are read."""
+
+    def __init__(self, data: dict[str, Any], prefix: str, recording: _Recording) -> None:
+        super().__init__(data)
+        self._prefix = prefix
+        self._recording = recording
+
+    def _wrap(self, key: str, value: Any) -> Any:
+        path = _join(self._prefix, key)
+        if isinstance(value, dict):
+            self._recording.navigate(path)
+            return _RecordingDict(value, path, self._recording)
+        self._recording.use(path)
+        return value
+
+    def _use_all(self) -> None:
+        self._recording.use(self._prefix)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            value = super().__getitem__(key)
+        except KeyError:
+            self._recording.use(_join(self._prefix, key))
+            raise
+        return self._wrap(key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if not super().__contains__(key):
+            self._recording.use(_join(self._prefix, key))
+            return default
+        return self._wrap(key, super().__getitem__(key))
+
+    def __contains__(self, key: object) -> bool:
+        self._recording.use(_join(self._prefix, str(key)))
+        return super().__contains__(key)
+
+    # Anything that can see all keys uses the whole object
+
+    def __iter__(self) -> Any:
+        self._use_all()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        self._use_all()
+        return super().__len__()
+
+    def __eq__(self, other: object) -> bool:
+        self._use_all()
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def keys(self) -> Any:
+        self._use_all()
+        return super().keys()
+
+    def values(self) -> Any:
+        self._use_all()
+        return super().values()
+
+    def items(self) -> Any:
+        self._use_all()
+        return super().items()
+
+    def copy(self) -> dict[str, Any]:
+        self._use_all()
+        return dict(super().items())
+
+
+class _ModelView:
+    """A read-only view of a generated model that records which fields are read."""
+
+    def __init__(self, model: Parsable, prefix: str, recording: _Recording) -> None:
+        object.__setattr__(self, "_model", model)
+        object.__setattr__(self, "_prefix", prefix)
+        object.__setattr__(self, "_recording", recording)
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._model, name)
+        if name == "additional_data":
+            # Attributes and features are only modelled as additional data
+            self._recording.navigate(self._prefix)
+            return _RecordingDict(value, self._prefix, self._recording)
+        if callable(value):
+            # e.g. serialize()
+            self._recording.use(self._prefix)
+            return value
+
+        path = _join(self._prefix, _FIELD_NAMES.get(name, name))
+        if isinstance(value, Parsable):
+            self._recording.navigate(path)
+            return _ModelView(value, path, self._recording)
+        self._recording.use(path)
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"'{type(self._model).__name__}' is read-only while recording a projection")
+
+    def __repr__(self) -> str:
+        return repr(self._model)
+
+
+def _call_site(depth: int) -> str:
+    frame = sys._getframe(depth + 1)
+    return f"{frame.f_globals.get('__name__')}:{frame.f_code.co_qualname}:{frame.f_lineno}"
+
+
+class ProjectionRecorder:
+    """Learns which fields of a thing each call site reads and fetches only those.
+
+    While profiling (`apply=False`), things are fetched completely and the returned
+    objects record every path that is read from them, e.g. `thingId`, `attributes/location`
+    or `features/lamp/properties/on`. With `apply=True`, call sites that were profiled
+    fetch their things with the recorded `fields` selector. Paths read outside of it are
+    logged, still recorded and included in the selector of the next run.
+
+    Call sites are identified by module, function and line number unless a `site` is given.
+    The returned things are read-only.
+
+    Args:
+        client: The Ditto client
+        apply: Fetch with the recorded selectors instead of only recording
+        profile: Recorded paths per call site, e.g. from a previous `save`
+    """
+
+    def __init__(
+        self, client: DittoClient, apply: bool = False, profile: dict[str, Iterable[str]] | None = None
+    ) -> None:
+        self._client = client
+        self._apply = apply
+        self._profile = {site: minimal_fields(paths) for site, paths in (profile or {}).items()}
+        self._recordings: dict[str, _Recording] = {}
+
+    @classmethod
+    def load(cls, client: DittoClient, path: str | Path, apply: bool = True) -> "ProjectionRecorder":
+        """Create a recorder from a profile saved with `save`, applying it by default."""
+        return cls(client, apply=apply, profile=json.loads(Path(path).read_text()))
+
+    def save(self, path: str | Path) -> None:
+        """Save the recorded paths of all call sites, merged with the loaded profile."""
+        Path(path).write_text(json.dumps(self.profile(), indent=2, sort_keys=True) + "\n")
+
+    def profile(self) -> dict[str, list[str]]:
+        """The minimal fields per call site, including the loaded profile."""
+        sites = set(self._profile) | set(self._recordings)
+        profile: dict[str, list[str]] = {}
+        for site in sites:
+            paths = set(self._profile.get(site, []))
+            recording = self._recordings.get(site)
+            if recording is not None:
+                paths |= recording.paths()
+            profile[site] = minimal_fields(paths)
+        return profile
+
+    def fields(self, site: str) -> str | None:
+        """The `fields` selector suggested for a call site, or None to fetch the whole thing."""
+        fields = self.profile().get(site)
+        return ",".join(fields) if fields else None
+
+    def get_thing(self, thing_id: str, site: str | None = None) -> Awaitable[Thing]:
+        """Fetch a thing for the calling site, with its recorded selector when applying."""
+        return self._get_thing(thing_id, site or _call_site(1))
+
+    async def _get_thing(self, thing_id: str, site: str) -> Thing:
+        selector = self._profile.get(site, []) if self._apply else []
+
+        query_params = WithThingItemRequestBuilder.WithThingItemRequestBuilderGetQueryParameters()
+        if selector:
+            query_params.fields = ",".join(selector)
+        thing = await self._client.api.two.things.by_thing_id(thing_id).get(
+            request_configuration=RequestConfiguration(query_parameters=query_params)
+        )
+        if thing is None:
+            raise ValueError(f"Thing '{thing_id}' not found")
+
+        recording = self._recordings.setdefault(site, _Recording())
+        if selector:
+            recording = _CheckedRecording(recording, site, selector)
+        return cast(Thing, _ModelView(thing, "", recording))
+
+
+class _CheckedRecording(_Recording):
+    """Records into another recording and warns about reads outside of the applied selector."""
+
+    def __init__(self, recording: _Recording, site: str, selector: list[str]) -> None:
+        self.used = recording.used
+        self.navigated = recording.navigated
+        self._site = site
+        self._selector = selector
+
+    def use(self, path: str) -> None:
+        if path not in self.used and not _covers(self._selector, path):
+            logger.warning(
+                "%s reads '%s', which is not in its fields selector '%s'", self._site, path, ",".join(self._selector)
+            )
+        super().use(path)
@@ -0,0 +1,127 @@
+from functools import lru_cache
+from typing import Any, TypeVar, overload
+
+from kiota_abstractions.base_request_builder import BaseRequestBuilder
+from kiota_abstractions.method import Method
+from pydantic import TypeAdapter
+
+from ditto_client._raw import build_request, send_json
+from ditto_client.generated.ditto_client import DittoClient
+
+T = TypeVar("T")
+
+# Marker returned by `select_value` when the pointer does not exist in the document
+MISSING: Any = object()
+
+
+def sub_resource_builder(client: DittoClient, thing_id: str, pointer: str) -> BaseRequestBuilder:
+    """Resolve the request builder of the thing sub-resource addressed by a thing-relative pointer.
+
+    Supported pointers are the thing itself (empty pointer), `attributes/{path}`,
+    `features/{featureId}/properties/{path}` and `features/{featureId}/desiredProperties/{path}`.
+    """
+    thing = client.api.two.things.by_thing_id(thing_id)
+    tokens = [token for token in pointer.split("/") if token]
+    if not tokens:
+        return thing
+
+    if tokens[0] == "attributes" and len(tokens) > 1:
+        return thing.attributes.by_attribute_path("/".join(tokens[1:]))
+    if tokens[0] == "features" and len(tokens) > 3:
+        feature = thing.features.by_feature_id(tokens[1])
+        if tokens[2] == "properties":
+            return feature.properties.by_property_path("/".join(tokens[3:]))
+        if tokens[2] == "desiredProperties":
+            return feature.desired_properties.by_property_path("/".join(tokens[3:]))
+    raise ValueError(f"No sub-resource endpoint for '{pointer}'")
+
+
+def select_value(document: Any, pointer: str) -> Any:
+    """Select the value at a slash-separated pointer in a decoded JSON document, or `MISSING`."""
+    node = document
+    for token in pointer.strip("/").split("/"):
+        if not isinstance(node, dict) or token not in node:
+            return MISSING
+        node = node[token]
+    return node
+
+
+@lru_cache(maxsize=128)
+def _type_adapter(as_type: Any) -> TypeAdapter[Any]:
+    return TypeAdapter(as_type)
+
+
+def decode_value(value: Any, as_type: Any = None) -> Any:
+    """Validate a decoded JSON value against `as_type`, or return it unchanged when no type is given."""
+    if as_type is None:
+        return value
+    return _type_adapter(as_type).validate_python(value)
+
+
+@overload
+async def get_value(client: DittoClient, thing_id: str, pointer: str) -> Any: ...
+
+
+@overload
+async def get_value(client: DittoClient, thing_id: str, pointer: str, as_type: type[T]) -> T: ...
+
+
+async def get_value(client: DittoClient, thing_id: str, pointer: str, as_type: Any = None) -> Any:
+    """Read a single attribute or (desired) feature property of a thing.
+
+    Args:
+        client: The Ditto client
+        thing_id: The ID of the thing
+        pointer: Thing-relative pointer, e.g. `attributes/location` or `features/lamp/properties/on`
+        as_type: Optional type the decoded JSON value is validated and converted to
+    """
+    builder = sub_resource_builder(client, thing_id, pointer)
+    value = await send_json(builder.request_adapter, build_request(builder, Method.GET))
+    return decode_value(value, as_type)
+
+
+@overload
+async def get_attribute(client: DittoClient, thing_id: str, attribute_path: str) -> Any: ...
+
+
+@overload
+async def get_attribute(client: DittoClient, thing_id: str, attribute_path: str, as_type: type[T]) -> T: ...
+
+
+async def get_attribute(client: DittoClient, thing_id: str, attribute_path: str, as_type: Any = None) -> Any:
+    """Read a single attribute of a thing."""
+    return await get_value(client, thing_id, f"attributes/{attribute_path}", as_type)
+
+
+@overload
+async def get_feature_property(client: DittoClient, thing_id: str, feature_id: str, property_path: str) -> Any: ...
+
+
+@overload
+async def get_feature_property(
+    client: DittoClient, thing_id: str, feature_id: str, property_path: str, as_type: type[T]
+) -> T: ...
+
+
+async def get_feature_property(
+    client: DittoClient, thing_id: str, feature_id: str, property_path: str, as_type: Any = None
+) -> Any:
+    """Read a single property of a feature."""
+    return await get_value(client, thing_id, f"features/{feature_id}/properties/{property_path}", as_type)
+
+
+@overload
+async def get_desired_property(client: DittoClient, thing_id: str, feature_id: str, property_path: str) -> Any: ...
+
+
+@overload
+async def get_desired_property(
+    client: DittoClient, thing_id: str, feature_id: str, property_path: str, as_type: type[T]
+) -> T: ...
+
+
+async def get_desired_property(
+    client: DittoClient, thing_id: str, feature_id: str, property_path: str, as_type: Any = None
+) -> Any:
+    """Read a single desired property of a feature."""
+    return await get_value(client, thing_id, f"features/{feature_id}/desiredProperties/{property_path}", as_type)
@@ -0,0 +1,76 @@
+import json
+from typing import Any
+
+from kiota_abstractions.base_request_builder import BaseRequestBuilder
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+from kiota_abstractions.method import Method
+from kiota_abstractions.request_adapter import RequestAdapter
+from kiota_abstractions.request_information import RequestInformation
+from kiota_abstractions.serialization import ParsableFactory
+
+from ditto_client.generated.models.advanced_error import AdvancedError
+
+DEFAULT_ERROR_MAPPING: dict[str, type[ParsableFactory[Any]]] = {
+    "4XX": AdvancedError,
+}
+
+_NO_BODY: Any = object()
+
+
+def encode_json(value: Any) -> bytes:
+    """Encode a JSON value compactly."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def build_request(
+    builder: BaseRequestBuilder,
+    method: Method,
+    request_configuration: RequestConfiguration[Any] | None = None,
+    body: Any = _NO_BODY,
+    content_type: str = "application/json",
+) -> RequestInformation:
+    """Build a request for a generated request builder with an arbitrary JSON body.
+
+    The generated builders only accept object bodies, while Ditto sub-resources (attributes,
+    properties, ...) accept any JSON value including scalars and arrays. A `bytes` body is
+    sent as is with the given content type.
+    """
+    request_info = RequestInformation(method, builder.url_template, builder.path_parameters)
+    request_info.configure(request_configuration)
+    request_info.headers.try_add("Accept", "application/json")
+    if isinstance(body, bytes):
+        request_info.set_stream_content(body, content_type)
+    elif body is not _NO_BODY:
+        request_info.set_stream_content(encode_json(body), content_type)
+    return request_info
+
+
+async def send_json(
+    request_adapter: RequestAdapter[Any],
+    request_info: RequestInformation,
+    error_mapping: dict[str, type[ParsableFactory[Any]]] | None = None,
+) -> Any:
+    """Send a request and decode the response body as plain JSON, bypassing model deserialization.
+
+    Returns None when the response has no content.
+    """
+    content: bytes | None = await request_adapter.send_primitive_async(
+        request_info,
+        "bytes",
+        error_mapping if error_mapping is not None else DEFAULT_ERROR_MAPPING,
+    )
+    if not content:
+        return None
+    return json.loads(content)
+
+
+async def send_no_content(
+    request_adapter: RequestAdapter[Any],
+    request_info: RequestInformation,
+    error_mapping: dict[str, type[ParsableFactory[Any]]] | None = None,
+) -> None:
+    """Send a request and discard the response body."""
+    await request_adapter.send_no_response_content_async(
+        request_info,
+        error_mapping if error_mapping is not None else DEFAULT_ERROR_MAPPING,
+    )
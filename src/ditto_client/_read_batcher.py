@@ -0,0 +1,131 @@
+import asyncio
+from types import TracebackType
+from typing import Any
+
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+
+from ditto_client._properties import MISSING, decode_value, select_value
+from ditto_client._raw import send_json
+from ditto_client.generated.api.two.things.item.with_thing_item_request_builder import WithThingItemRequestBuilder
+from ditto_client.generated.ditto_client import DittoClient
+
+
+class ReadBatcher:
+    """Coalesces single-value reads of things into one field-projected GET per thing.
+
+    Reads issued within `window` seconds of each other, or inside an `async with` block,
+    are grouped per thing and fetched with a combined `fields` selector such as
+    `features/a/properties/x,attributes/loc`. Every read returns a future that resolves
+    to the decoded JSON value.
+
+    ```python
+    async with ReadBatcher(client) as batch:
+        temperature = batch.get_feature_property(thing_id, "temperature", "value")
+        location = batch.get_attribute(thing_id, "location")
+    print(await temperature, await location)
+    ```
+    """
+
+    def __init__(self, client: DittoClient, window: float = 0.002, max_fields: int = 64) -> None:
+        self._client = client
+        self._window = window
+        self._max_fields = max_fields
+        self._pending: dict[str, list[tuple[str, Any, asyncio.Future[Any]]]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._depth = 0
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def get(self, thing_id: str, pointer: str, as_type: Any = None) -> asyncio.Future[Any]:
+        """Queue a read of a thing-relative pointer (e.g. `attributes/location`)."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        self._pending.setdefault(thing_id, []).append((pointer.strip("/"), as_type, future))
+
+        if self._depth == 0 and self._timer is None:
+            self._timer = loop.call_later(self._window, self._schedule_flush)
+        return future
+
+    def get_attribute(self, thing_id: str, attribute_path: str, as_type: Any = None) -> asyncio.Future[Any]:
+        """Queue a read of a single attribute."""
+        return self.get(thing_id, f"attributes/{attribute_path}", as_type)
+
+    def get_feature_property(
+        self, thing_id: str, feature_id: str, property_path: str, as_type: Any = None
+    ) -> asyncio.Future[Any]:
+        """Queue a read of a single feature property."""
+        return self.get(thing_id, f"features/{feature_id}/properties/{property_path}", as_type)
+
+    def get_desired_property(
+        self, thing_id: str, feature_id: str, property_path: str, as_type: Any = None
+    ) -> asyncio.Future[Any]:
+        """Queue a read of a single desired feature property."""
+        return self.get(thing_id, f"features/{feature_id}/desiredProperties/{property_path}", as_type)
+
+    async def flush(self) -> None:
+        """Send all queued reads now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, {}
+        await asyncio.gather(*(self._read(thing_id, reads) for thing_id, reads in pending.items()))
+
+    def _schedule_flush(self) -> None:
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _read(self, thing_id: str, reads: list[tuple[str, Any, asyncio.Future[Any]]]) -> None:
+        pointers = list(dict.fromkeys(pointer for pointer, _, future in reads if not future.done()))
+
+        builder = self._client.api.two.things.by_thing_id(thing_id)
+        for start in range(0, len(pointers), self._max_fields):
+            chunk = pointers[start : start + self._max_fields]
+
+            query_params = WithThingItemRequestBuilder.WithThingItemRequestBuilderGetQueryParameters()
+            query_params.fields = ",".join(chunk)
+            request_info = builder.to_get_request_information(RequestConfiguration(query_parameters=query_params))
+
+            document: Any = None
+            error: BaseException | None = None
+            try:
+                document = await send_json(builder.request_adapter, request_info)
+            except asyncio.CancelledError:
+                # The remaining chunks are not read either, so no caller is left waiting
+                for _, _, future in reads:
+                    future.cancel()
+                raise
+            except Exception as e:
+                error = e
+
+            selected = set(chunk)
+            for pointer, as_type, future in reads:
+                if pointer not in selected or future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                    continue
+
+                value = select_value(document, pointer)
+                if value is MISSING:
+                    future.set_exception(LookupError(f"'{pointer}' not found on thing '{thing_id}'"))
+                    continue
+                try:
+                    future.set_result(decode_value(value, as_type))
+                except Exception as e:
+                    future.set_exception(e)
+
+    async def __aenter__(self) -> "ReadBatcher":
+        self._depth += 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            await self.flush()
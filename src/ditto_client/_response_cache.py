@@ -0,0 +1,90 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Any, cast
+
+import httpx
+from kiota_http.middleware import BaseMiddleware
+
+# The thing or policy a request path belongs to
+_ENTITY_PATH = re.compile(r"^(/api/2/(?:things|policies)/[^/]+)")
+
+# Headers every request of a client carries; any other header, e.g. at-historical-revision or
+# If-None-Match, may change the response, so such requests bypass the cache
+_CLIENT_HEADERS = frozenset(
+    {"host", "accept", "accept-encoding", "connection", "user-agent", "authorization", "x-ditto-pre-authenticated"}
+)
+
+
+class ResponseCache(BaseMiddleware):
+    """HTTP middleware caching successful GET responses of things and policies for `ttl` seconds.
+
+    Any other request to a thing or policy drops the cached responses of that entity, so a
+    client sees its own writes. Changes made by others are visible after `ttl` seconds at the
+    latest. GET requests with headers of their own, e.g. `at-historical-revision` or
+    conditional headers, are never cached. A `ttl` of 0 disables caching.
+
+    ```python
+    cache = ResponseCache(ttl=30)
+    http_client = KiotaClientFactory.create_with_custom_middleware(
+        [cache, *KiotaClientFactory.get_default_middleware(None)]
+    )
+    ```
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 512) -> None:
+        super().__init__()  # type: ignore[no-untyped-call]
+        self.ttl = ttl
+        self._max_entries = max_entries
+        # (url, accept) -> (expires, status, headers, content)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, int, list[tuple[bytes, bytes]], bytes]] = OrderedDict()
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+
+    def invalidate(self, path: str) -> None:
+        """Drop the cached responses of the thing or policy at a request path."""
+        match = _ENTITY_PATH.match(path)
+        if match is None:
+            return
+        prefix = match.group(1)
+        for key in [key for key in self._entries if httpx.URL(key[0]).path.startswith(prefix)]:
+            del self._entries[key]
+
+    async def _forward(self, request: httpx.Request, transport: Any) -> httpx.Response:
+        response = await super().send(request, transport)  # type: ignore[no-untyped-call]
+        return cast(httpx.Response, response)
+
+    async def send(self, request: httpx.Request, transport: Any) -> httpx.Response:
+        path = request.url.path
+        if _ENTITY_PATH.match(path) is None:
+            return await self._forward(request, transport)
+        if request.method != "GET":
+            self.invalidate(path)
+            return await self._forward(request, transport)
+        if self.ttl <= 0 or any(name.lower() not in _CLIENT_HEADERS for name in request.headers):
+            return await self._forward(request, transport)
+
+        key = (str(request.url), request.headers.get("accept", ""))
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, status, headers, content = entry
+            if expires >= time.monotonic():
+                self._entries.move_to_end(key)
+                return httpx.Response(status, headers=headers, content=content, request=request)
+            del self._entries[key]
+
+        response = await self._forward(request, transport)
+        if response.status_code == 200:
+            content = await response.aread()
+            # The content is stored decoded
+            headers = [
+                (name, value)
+                for name, value in response.headers.raw
+                if name.lower() not in (b"content-encoding", b"content-length", b"transfer-encoding")
+            ]
+            self._entries[key] = (time.monotonic() + self.ttl, response.status_code, headers, content)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return response
@@ -0,0 +1,371 @@
+"""Building, parsing and canonicalizing RQL filters.
+
+```python
+query = And(Eq("attributes/location", "kitchen"), Gt("features/temperature/properties/value", 20))
+str(query)  # 'and(eq(attributes/location,"kitchen"),gt(features/temperature/properties/value,20))'
+
+parse_filter('and( gt(x, 1), eq(y,"a") )').canonical().to_rql()  # 'and(eq(y,"a"),gt(x,1))'
+```
+"""
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import ClassVar
+
+Value = str | int | float | bool | None
+
+# Top-level fields of a thing that can be searched
+SEARCHABLE_ROOTS = frozenset(
+    {
+        "thingId",
+        "policyId",
+        "definition",
+        "attributes",
+        "features",
+        "_namespace",
+        "_created",
+        "_modified",
+        "_revision",
+        "_metadata",
+    }
+)
+
+
+class RQLSyntaxError(ValueError):
+    """An RQL filter that is not valid."""
+
+    def __init__(self, message: str, filter: str, position: int) -> None:
+        super().__init__(f"{message} at position {position}: {filter}")
+        self.filter = filter
+        self.position = position
+
+
+def format_value(value: Value) -> str:
+    """Format a value as an RQL literal, quoting strings with double quotes."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int | float):
+        return repr(value)
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+class Query(ABC):
+    """Base class of all RQL filter expressions."""
+
+    @abstractmethod
+    def to_rql(self) -> str:
+        """The filter as an RQL string."""
+
+    def canonical(self) -> "Query":
+        """An equivalent query in canonical form, so that equal filters serialize identically."""
+        return self
+
+    def properties(self) -> list[str]:
+        """The properties the query refers to."""
+        return []
+
+    def warnings(self) -> list[str]:
+        """Parts of the query that are expensive for the search service to evaluate."""
+        return [
+            f"'{prop}' is not a searchable field"
+            for prop in dict.fromkeys(self.properties())
+            if prop.strip("/").split("/", 1)[0] not in SEARCHABLE_ROOTS
+        ]
+
+    def __str__(self) -> str:
+        return self.to_rql()
+
+
+@dataclass(frozen=True)
+class _Comparison(Query):
+    operator: ClassVar[str]
+
+    property: str
+    value: Value
+
+    def to_rql(self) -> str:
+        return f"{self.operator}({self.property},{format_value(self.value)})"
+
+    def properties(self) -> list[str]:
+        return [self.property]
+
+
+class Eq(_Comparison):
+    operator = "eq"
+
+
+class Ne(_Comparison):
+    operator = "ne"
+
+    def warnings(self) -> list[str]:
+        return [*super().warnings(), f"'{self}' is a negation and cannot use an index efficiently"]
+
+
+class Gt(_Comparison):
+    operator = "gt"
+
+
+class Ge(_Comparison):
+    operator = "ge"
+
+
+class Lt(_Comparison):
+    operator = "lt"
+
+
+class Le(_Comparison):
+    operator = "le"
+
+
+class Like(_Comparison):
+    """Matches strings with the wildcards `*` (any characters) and `?` (one character)."""
+
+    operator = "like"
+
+    def warnings(self) -> list[str]:
+        warnings = super().warnings()
+        if isinstance(self.value, str) and self.value[:1] in ("*", "?"):
+            warnings.append(f"'{self}' starts with a wildcard and has to scan all values")
+        return warnings
+
+
+class ILike(Like):
+    """Case-insensitive `Like`."""
+
+    operator = "ilike"
+
+
+@dataclass(frozen=True, init=False)
+class In(Query):
+    property: str
+    values: tuple[Value, ...]
+
+    def __init__(self, property: str, *values: Value) -> None:
+        object.__setattr__(self, "property", property)
+        object.__setattr__(self, "values", values)
+
+    def to_rql(self) -> str:
+        return f"in({self.property},{','.join(format_value(value) for value in self.values)})"
+
+    def canonical(self) -> Query:
+        values = sorted({format_value(value): value for value in self.values}.items())
+        if len(values) == 1:
+            return Eq(self.property, values[0][1])
+        return In(self.property, *(value for _, value in values))
+
+    def properties(self) -> list[str]:
+        return [self.property]
+
+
+@dataclass(frozen=True)
+class Exists(Query):
+    property: str
+
+    def to_rql(self) -> str:
+        return f"exists({self.property})"
+
+    def properties(self) -> list[str]:
+        return [self.property]
+
+
+@dataclass(frozen=True, init=False)
+class _Logical(Query):
+    operator: ClassVar[str]
+
+    queries: tuple[Query, ...] = field(default=())
+
+    def __init__(self, *queries: Query) -> None:
+        object.__setattr__(self, "queries", queries)
+
+    def to_rql(self) -> str:
+        return f"{self.operator}({','.join(query.to_rql() for query in self.queries)})"
+
+    def canonical(self) -> Query:
+        operands: dict[str, Query] = {}
+        for query in self.queries:
+            query = query.canonical()
+            # and(a,and(b,c)) is and(a,b,c)
+            nested = query.queries if type(query) is type(self) and isinstance(query, _Logical) else (query,)
+            operands.update((operand.to_rql(), operand) for operand in nested)
+        if len(operands) == 1:
+            return next(iter(operands.values()))
+        return type(self)(*(operands[key] for key in sorted(operands)))
+
+    def properties(self) -> list[str]:
+        return [prop for query in self.queries for prop in query.properties()]
+
+    def warnings(self) -> list[str]:
+        return list(dict.fromkeys(warning for query in self.queries for warning in query.warnings()))
+
+
+class And(_Logical):
+    operator = "and"
+
+
+class Or(_Logical):
+    operator = "or"
+
+
+@dataclass(frozen=True)
+class Not(Query):
+    query: Query
+
+    def to_rql(self) -> str:
+        return f"not({self.query.to_rql()})"
+
+    def canonical(self) -> Query:
+        query = self.query.canonical()
+        return query.query if isinstance(query, Not) else Not(query)
+
+    def properties(self) -> list[str]:
+        return self.query.properties()
+
+    def warnings(self) -> list[str]:
+        return [*self.query.warnings(), f"'{self}' is a negation and cannot use an index efficiently"]
+
+
+_COMPARISONS: dict[str, type[_Comparison]] = {cls.operator: cls for cls in (Eq, Ne, Gt, Ge, Lt, Le, Like, ILike)}
+_LOGICAL: dict[str, type[_Logical]] = {"and": And, "or": Or}
+
+_WHITESPACE = re.compile(r"\s*")
+_OPERATOR = re.compile(r"[a-z]+")
+_PROPERTY = re.compile(r"[^\s,()\"']+")
+_LITERAL = re.compile(r"-?\d+(\.\d+)?([eE][-+]?\d+)?(?![\w.])|true|false|null")
+
+
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.pos = 0
+
+    def error(self, message: str) -> RQLSyntaxError:
+        return RQLSyntaxError(message, self.text, self.pos)
+
+    def skip(self) -> None:
+        self.pos = _WHITESPACE.match(self.text, self.pos).end()  # type: ignore[union-attr]
+
+    def expect(self, char: str) -> None:
+        self.skip()
+        if not self.text.startswith(char, self.pos):
+            raise self.error(f"Expected '{char}'")
+        self.pos += 1
+
+    def peek(self, char: str) -> bool:
+        self.skip()
+        return self.text.startswith(char, self.pos)
+
+    def query(self) -> Query:
+        self.skip()
+        match = _OPERATOR.match(self.text, self.pos)
+        if match is None:
+            raise self.error("Expected an operator")
+        operator = match.group()
+        start = self.pos
+        self.pos = match.end()
+        self.expect("(")
+
+        query: Query
+        if operator in _LOGICAL:
+            queries = [self.query()]
+            while self.peek(","):
+                self.pos += 1
+                queries.append(self.query())
+            query = _LOGICAL[operator](*queries)
+        elif operator == "not":
+            query = Not(self.query())
+        elif operator in _COMPARISONS:
+            prop = self.property()
+            self.expect(",")
+            value = self.value()
+            if operator in ("like", "ilike") and not isinstance(value, str):
+                raise self.error(f"'{operator}' requires a string")
+            query = _COMPARISONS[operator](prop, value)
+        elif operator == "in":
+            prop = self.property()
+            values: list[Value] = []
+            while self.peek(","):
+                self.pos += 1
+                values.append(self.value())
+            if not values:
+                raise self.error("'in' requires at least one value")
+            query = In(prop, *values)
+        elif operator == "exists":
+            query = Exists(self.property())
+        else:
+            self.pos = start
+            raise self.error(f"Unknown operator '{operator}'")
+
+        self.expect(")")
+        return query
+
+    def property(self) -> str:
+        self.skip()
+        match = _PROPERTY.match(self.text, self.pos)
+        if match is None:
+            raise self.error("Expected a property")
+        self.pos = match.end()
+        return match.group()
+
+    def value(self) -> Value:
+        self.skip()
+        quote = self.text[self.pos : self.pos + 1]
+        if quote in ('"', "'"):
+            return self.string(quote)
+
+        match = _LITERAL.match(self.text, self.pos)
+        if match is None:
+            raise self.error("Expected a quoted string, number, true, false or null")
+        self.pos = match.end()
+        literal = match.group()
+        if literal in ("true", "false"):
+            return literal == "true"
+        if literal == "null":
+            return None
+        return float(literal) if match.group(1) or match.group(2) else int(literal)
+
+    def string(self, quote: str) -> str:
+        chars: list[str] = []
+        pos = self.pos + 1
+        while pos < len(self.text):
+            char = self.text[pos]
+            if char == "\\" and pos + 1 < len(self.text):
+                chars.append(self.text[pos + 1])
+                pos += 2
+            elif char == quote:
+                self.pos = pos + 1
+                return "".join(chars)
+            else:
+                chars.append(char)
+                pos += 1
+        raise self.error("Unterminated string")
+
+
+@lru_cache(maxsize=1024)
+def parse_filter(filter: str) -> Query:
+    """Parse and validate an RQL filter.
+
+    Results are memoized, which is safe because queries are immutable.
+
+    Raises:
+        RQLSyntaxError: If the filter is not valid RQL
+    """
+    parser = _Parser(filter)
+    query = parser.query()
+    parser.skip()
+    if parser.pos != len(filter):
+        raise parser.error("Unexpected trailing input")
+    return query
+
+
+def canonical_filter(filter: str) -> str:
+    """Serialize a filter in canonical form, e.g. for use as a cache key.
+
+    Operands of `and`/`or` and values of `in` are sorted and deduplicated, nested
+    operators of the same kind are flattened and strings are always double-quoted.
+    """
+    return parse_filter(filter).canonical().to_rql()
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+
+from ditto_client._concurrency import gather_bounded
+from ditto_client._rql import RQLSyntaxError, canonical_filter
+from ditto_client.generated.api.two.search.things.count.count_request_builder import CountRequestBuilder
+from ditto_client.generated.ditto_client import DittoClient
+
+# (canonical filter, sorted namespaces)
+_Key = tuple[str, tuple[str, ...]]
+
+
+def normalize_filter(filter: str | None) -> str:
+    """Remove insignificant whitespace from an RQL filter, leaving quoted strings untouched."""
+    if not filter:
+        return ""
+
+    result: list[str] = []
+    quote: str | None = None
+    escaped = False
+    for char in filter:
+        if quote is not None:
+            result.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+            result.append(char)
+        elif not char.isspace():
+            result.append(char)
+    return "".join(result)
+
+
+@dataclass(frozen=True)
+class CountQuery:
+    """A search count, optionally restricted by an RQL filter and to namespaces."""
+
+    filter: str | None = None
+    namespaces: tuple[str, ...] = ()
+
+    def key(self) -> _Key:
+        try:
+            filter = canonical_filter(self.filter) if self.filter else ""
+        except RQLSyntaxError:
+            # Let the server report the error
+            filter = normalize_filter(self.filter)
+        return filter, tuple(sorted(set(self.namespaces)))
+
+
+class CountCache:
+    """Counts things through `/api/2/search/things/count`, caching results for `ttl` seconds.
+
+    Queries are cached by their canonical filter and namespaces, so filters that only
+    differ in whitespace, quoting, operand or namespace order share one entry. Concurrent counts of the same
+    query share one request.
+    """
+
+    def __init__(self, client: DittoClient, ttl: float = 60.0, max_entries: int = 1024) -> None:
+        self._client = client
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._cache: OrderedDict[_Key, tuple[float, int]] = OrderedDict()
+        self._in_flight: dict[_Key, asyncio.Future[int]] = {}
+
+    async def _request(self, key: _Key) -> int:
+        filter, namespaces = key
+        query_params = CountRequestBuilder.CountRequestBuilderGetQueryParameters()
+        if filter:
+            query_params.filter = filter
+        if namespaces:
+            query_params.namespaces = ",".join(namespaces)
+        response = await self._client.api.two.search.things.count.get(
+            request_configuration=RequestConfiguration(query_parameters=query_params)
+        )
+        return int(response or 0)
+
+    async def count(self, filter: str | None = None, namespaces: Iterable[str] = ()) -> int:
+        """Count the things matching a filter in the given namespaces (all if empty)."""
+        key = CountQuery(filter, tuple(namespaces)).key()
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires >= time.monotonic():
+                self._cache.move_to_end(key)
+                return value
+            del self._cache[key]
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._request(key))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._complete(key, done))
+        return await asyncio.shield(future)
+
+    def _complete(self, key: _Key, future: "asyncio.Future[int]") -> None:
+        del self._in_flight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._cache[key] = (time.monotonic() + self._ttl, future.result())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+    async def count_many(self, queries: Iterable[CountQuery], concurrency: int = 16) -> list[int]:
+        """Run many counts concurrently and return them in the order of the queries."""
+        return await gather_bounded((self.count(query.filter, query.namespaces) for query in queries), concurrency)
+
+    def invalidate(self) -> None:
+        """Drop all cached counts."""
+        self._cache.clear()
+
+
+async def count_groups(
+    client: DittoClient,
+    namespaces: Iterable[str] | None = None,
+    filters: Iterable[str] | None = None,
+    base_filter: str | None = None,
+    group_by_namespace: bool = True,
+    concurrency: int = 16,
+    cache: CountCache | None = None,
+) -> list[dict[str, Any]]:
+    """Count things per namespace, per filter bucket or per combination of both.
+
+    Every row contains the `namespace` and/or `filter` it was counted for and the `count`.
+    `base_filter` is combined with every filter bucket using `and`.
+
+    Args:
+        client: The Ditto client
+        namespaces: The namespaces to count in
+        filters: Count each of these RQL filters separately
+        base_filter: A filter that applies to all counts
+        group_by_namespace: Count each namespace separately instead of all together
+        concurrency: Maximum number of concurrent requests
+        cache: A cache to share counts with other calls
+    """
+    cache = cache or CountCache(client)
+    namespaces = list(dict.fromkeys(namespaces or []))
+    namespace_groups: list[tuple[str, ...]] = (
+        [(namespace,) for namespace in namespaces] if group_by_namespace and namespaces else [tuple(namespaces)]
+    )
+    filter_groups: list[str | None] = list(dict.fromkeys(filters)) if filters else [None]
+
+    rows: list[dict[str, Any]] = []
+    queries: list[CountQuery] = []
+    for group in namespace_groups:
+        for bucket in filter_groups:
+            row: dict[str, Any] = {}
+            if group_by_namespace and namespaces:
+                row["namespace"] = group[0]
+            if bucket is not None:
+                row["filter"] = bucket
+
+            parts = [part for part in (base_filter, bucket) if part]
+            combined = f"and({','.join(parts)})" if len(parts) > 1 else parts[0] if parts else None
+            rows.append(row)
+            queries.append(CountQuery(combined, group))
+
+    for row, value in zip(rows, await cache.count_many(queries, concurrency), strict=True):
+        row["count"] = value
+    return rows
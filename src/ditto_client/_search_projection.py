@@ -0,0 +1,84 @@
+from collections.abc import Iterable
+from typing import Any
+
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+
+from ditto_client._concurrency import gather_bounded
+from ditto_client._properties import MISSING, decode_value, select_value
+from ditto_client._raw import send_json
+from ditto_client._rql import In
+from ditto_client.generated.api.two.search.things.things_post_request_body import ThingsPostRequestBody
+from ditto_client.generated.api.two.search.things.things_request_builder import ThingsRequestBuilder
+from ditto_client.generated.ditto_client import DittoClient
+
+# Maximum page size supported by the search service
+MAX_PAGE_SIZE = 200
+
+# Filters longer than this are sent in a form-encoded POST body instead of the query string
+MAX_QUERY_FILTER_LENGTH = 1500
+
+
+def _in_filter(thing_ids: list[str]) -> str:
+    return In("thingId", *thing_ids).to_rql()
+
+
+async def _search_chunk(client: DittoClient, thing_ids: list[str], fields: str) -> list[dict[str, Any]]:
+    builder = client.api.two.search.things
+    filter = _in_filter(thing_ids)
+    option = f"size({MAX_PAGE_SIZE})"
+
+    if len(filter) > MAX_QUERY_FILTER_LENGTH:
+        body = ThingsPostRequestBody(filter=filter, fields=fields, option=option)
+        request_info = builder.to_post_request_information(body)
+    else:
+        query_params = ThingsRequestBuilder.ThingsRequestBuilderGetQueryParameters()
+        query_params.filter = filter
+        query_params.fields = fields
+        query_params.option = option
+        request_info = builder.to_get_request_information(RequestConfiguration(query_parameters=query_params))
+
+    response = await send_json(builder.request_adapter, request_info)
+    if not isinstance(response, dict):
+        return []
+    return [item for item in response.get("items") or [] if isinstance(item, dict)]
+
+
+async def project_values(
+    client: DittoClient,
+    thing_ids: Iterable[str],
+    pointer: str,
+    as_type: Any = None,
+    chunk_size: int = MAX_PAGE_SIZE,
+    concurrency: int = 4,
+) -> dict[str, Any]:
+    """Read the same value from many things through the search API.
+
+    The IDs are split into chunks that are searched with an `in(thingId,...)` filter and a
+    `thingId,<pointer>` field selector, so one request returns the value of up to 200 things.
+    Things that do not exist, are not readable or do not have the value are left out of the result.
+
+    Args:
+        client: The Ditto client
+        thing_ids: The IDs of the things to read
+        pointer: Thing-relative pointer of the value, e.g. `attributes/firmware/version`
+        as_type: Optional type the values are validated and converted to
+        chunk_size: Number of things per search request (at most 200)
+        concurrency: Maximum number of concurrent search requests
+    """
+    if not 1 <= chunk_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_PAGE_SIZE}")
+
+    ids = list(dict.fromkeys(thing_ids))
+    pointer = pointer.strip("/")
+    fields = f"thingId,{pointer}"
+
+    chunks = [ids[start : start + chunk_size] for start in range(0, len(ids), chunk_size)]
+    pages = await gather_bounded((_search_chunk(client, chunk, fields) for chunk in chunks), concurrency)
+
+    values: dict[str, Any] = {}
+    for page in pages:
+        for item in page:
+            value = select_value(item, pointer)
+            if value is not MISSING and "thingId" in item:
+                values[item["thingId"]] = decode_value(value, as_type)
+    return values
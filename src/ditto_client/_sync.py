@@ -0,0 +1,172 @@
+import asyncio
+import inspect
+import threading
+from collections.abc import Awaitable, Iterable
+from typing import Any, TypeVar
+
+import httpx
+from kiota_abstractions.authentication.authentication_provider import AuthenticationProvider
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+from kiota_abstractions.method import Method
+from kiota_http.httpx_request_adapter import HttpxRequestAdapter
+from kiota_http.kiota_client_factory import KiotaClientFactory
+
+from ditto_client._properties import get_value, sub_resource_builder
+from ditto_client._raw import build_request, send_json, send_no_content
+from ditto_client.generated.api.two.search.things.count.count_request_builder import CountRequestBuilder
+from ditto_client.generated.api.two.search.things.things_request_builder import ThingsRequestBuilder
+from ditto_client.generated.api.two.things.item.with_thing_item_request_builder import WithThingItemRequestBuilder
+from ditto_client.generated.ditto_client import DittoClient
+
+T = TypeVar("T")
+
+
+class SyncDittoClient:
+    """A blocking Ditto client for synchronous code, safe to share between threads.
+
+    All requests run on one event loop in a background thread, so the HTTP connection pool
+    is reused across calls and threads instead of being created per `asyncio.run`. The
+    operations return decoded JSON; anything else can be run with `run`:
+
+    ```python
+    ditto = SyncDittoClient("http://localhost:8080", BasicAuthProvider(user_name="ditto", password="ditto"))
+    thing = ditto.get_thing("my.sensors:sensor-1", fields="attributes")
+    policy = ditto.run(ditto.client.api.two.policies.by_policy_id("my.sensors:policy").get())
+    ditto.close()
+    ```
+
+    Args:
+        base_url: Base URL of the Ditto API
+        auth_provider: The authentication provider
+        http_client: The HTTP client to use, closed together with this client
+        timeout: Default timeout in seconds of blocking calls (None waits forever)
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        auth_provider: AuthenticationProvider,
+        http_client: httpx.AsyncClient | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        self._http_client = http_client or KiotaClientFactory.create_with_default_middleware()
+        request_adapter = HttpxRequestAdapter(auth_provider, http_client=self._http_client)
+        request_adapter.base_url = base_url
+        self._client = DittoClient(request_adapter)
+        self._timeout = timeout
+
+        self._lock = threading.Lock()
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="ditto-client", daemon=True)
+        self._thread.start()
+
+    @property
+    def client(self) -> DittoClient:
+        """The asynchronous client, for use within coroutines passed to `run`."""
+        return self._client
+
+    def run(self, awaitable: Awaitable[T], timeout: float | None = None) -> T:
+        """Run a coroutine on the background loop and wait for its result.
+
+        Raises:
+            TimeoutError: If the result is not available within the timeout; the coroutine is cancelled
+            RuntimeError: If the client is closed or called from its own event loop; the coroutine is closed
+        """
+        error = None
+        if self._closed:
+            error = "SyncDittoClient is closed"
+        elif threading.current_thread() is self._thread:
+            error = "SyncDittoClient.run() cannot be called from its own event loop"
+        if error is not None:
+            # Avoid a "coroutine was never awaited" warning
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            raise RuntimeError(error)
+
+        async def _await() -> T:
+            return await awaitable
+
+        future = asyncio.run_coroutine_threadsafe(_await(), self._loop)
+        try:
+            return future.result(timeout if timeout is not None else self._timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        """Close the connection pool and stop the background loop."""
+        with self._lock:
+            if self._closed:
+                return
+            self.run(self._http_client.aclose())
+            self._closed = True
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "SyncDittoClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def whoami(self) -> Any:
+        """Get the authenticated subjects."""
+        builder = self._client.api.two.whoami
+        return self.run(send_json(builder.request_adapter, build_request(builder, Method.GET)))
+
+    def get_thing(self, thing_id: str, fields: str | None = None) -> Any:
+        """Get a thing, optionally restricted to a fields selector."""
+        builder = self._client.api.two.things.by_thing_id(thing_id)
+        query_params = WithThingItemRequestBuilder.WithThingItemRequestBuilderGetQueryParameters()
+        if fields:
+            query_params.fields = fields
+        request_info = build_request(builder, Method.GET, RequestConfiguration(query_parameters=query_params))
+        return self.run(send_json(builder.request_adapter, request_info))
+
+    def put_thing(self, thing_id: str, thing: dict[str, Any]) -> None:
+        """Create or replace a thing."""
+        builder = self._client.api.two.things.by_thing_id(thing_id)
+        self.run(send_no_content(builder.request_adapter, build_request(builder, Method.PUT, body=thing)))
+
+    def delete_thing(self, thing_id: str) -> None:
+        """Delete a thing."""
+        builder = self._client.api.two.things.by_thing_id(thing_id)
+        self.run(send_no_content(builder.request_adapter, build_request(builder, Method.DELETE)))
+
+    def get_value(self, thing_id: str, pointer: str, as_type: Any = None) -> Any:
+        """Read an attribute or (desired) feature property, e.g. `attributes/location`."""
+        return self.run(get_value(self._client, thing_id, pointer, as_type))
+
+    def put_value(self, thing_id: str, pointer: str, value: Any) -> None:
+        """Write an attribute or (desired) feature property."""
+        builder = sub_resource_builder(self._client, thing_id, pointer)
+        self.run(send_no_content(builder.request_adapter, build_request(builder, Method.PUT, body=value)))
+
+    def search_things(
+        self,
+        filter: str | None = None,
+        fields: str | None = None,
+        option: str | None = None,
+        namespaces: Iterable[str] = (),
+    ) -> list[Any]:
+        """Search for things and return one page of results."""
+        builder = self._client.api.two.search.things
+        query_params = ThingsRequestBuilder.ThingsRequestBuilderGetQueryParameters()
+        query_params.filter = filter
+        query_params.fields = fields
+        query_params.option = option
+        query_params.namespaces = ",".join(namespaces) or None
+        request_info = build_request(builder, Method.GET, RequestConfiguration(query_parameters=query_params))
+        response = self.run(send_json(builder.request_adapter, request_info))
+        return list((response or {}).get("items", []))
+
+    def count_things(self, filter: str | None = None, namespaces: Iterable[str] = ()) -> int:
+        """Count the things matching a filter."""
+        builder = self._client.api.two.search.things.count
+        query_params = CountRequestBuilder.CountRequestBuilderGetQueryParameters()
+        query_params.filter = filter
+        query_params.namespaces = ",".join(namespaces) or None
+        request_info = build_request(builder, Method.GET, RequestConfiguration(query_parameters=query_params))
+        return int(self.run(send_json(builder.request_adapter, request_info)) or 0)
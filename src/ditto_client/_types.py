@@ -1,5 +1,13 @@
+import asyncio
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from ditto_client._response_cache import ResponseCache
+from ditto_client._search_count import CountCache
 from ditto_client.generated.ditto_client import DittoClient
 
+T = TypeVar("T")
+
 
 class CmdState:
     """Holds state shared across all CLI commands."""
@@ -7,6 +15,9 @@ class CmdState:
     def __init__(self) -> None:
         self._client: DittoClient | None = None
         self._table: bool = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._cache: ResponseCache | None = None
+        self._count_cache: CountCache | None = None
 
     @property
     def client(self) -> DittoClient:
@@ -29,3 +40,48 @@ class CmdState:
     def table(self, value: bool) -> None:
         """Set table output flag."""
         self._table = value
+
+    @property
+    def cache(self) -> ResponseCache:
+        """Access the response cache of the client with validation."""
+        if self._cache is None:
+            raise ValueError("Response cache has not been initialized")
+        return self._cache
+
+    @cache.setter
+    def cache(self, value: ResponseCache) -> None:
+        """Set the response cache of the client."""
+        self._cache = value
+
+    @property
+    def count_cache(self) -> CountCache:
+        """Get the cache of search counts, created for the client on first use."""
+        if self._count_cache is None:
+            self._count_cache = CountCache(self.client)
+        return self._count_cache
+
+    @count_cache.setter
+    def count_cache(self, value: CountCache) -> None:
+        """Set a cache of search counts shared with other commands."""
+        self._count_cache = value
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop | None:
+        """Get the shared event loop commands run on, if any."""
+        return self._loop
+
+    @loop.setter
+    def loop(self, value: asyncio.AbstractEventLoop | None) -> None:
+        """Set a shared event loop running in another thread."""
+        self._loop = value
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a command coroutine on the shared event loop, or on a new one if there is none."""
+        if self._loop is None:
+            return asyncio.run(coro)
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result()
+        except KeyboardInterrupt:
+            future.cancel()
+            raise
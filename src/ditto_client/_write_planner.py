@@ -0,0 +1,252 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from kiota_abstractions.api_error import APIError
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+from kiota_abstractions.method import Method
+
+from ditto_client._concurrency import gather_bounded
+from ditto_client._properties import sub_resource_builder
+from ditto_client._raw import build_request, encode_json, send_json, send_no_content
+from ditto_client.generated.api.two.things.item.with_thing_item_request_builder import WithThingItemRequestBuilder
+from ditto_client.generated.ditto_client import DittoClient
+
+# Rough size in bytes of the request line and headers of a single write, used to weigh
+# one merge PATCH against several targeted writes
+DEFAULT_REQUEST_OVERHEAD = 256
+
+_DELETED: Any = object()
+_TARGETED_FEATURE_SECTIONS = ("properties", "desiredProperties")
+_METHODS = {"PUT": Method.PUT, "PATCH": Method.PATCH, "DELETE": Method.DELETE}
+
+
+@dataclass(frozen=True)
+class WriteOperation:
+    """A single write against a thing or one of its sub-resources.
+
+    `pointer` is relative to the thing, e.g. `/attributes/location` or
+    `/features/lamp/properties/on`; the empty pointer addresses the thing itself.
+    A `PATCH` on the thing carries a JSON merge patch (RFC 7396).
+    """
+
+    method: str
+    pointer: str
+    value: Any = None
+
+    def to_dict(self) -> dict[str, Any]:
+        if self.method == "DELETE":
+            return {"method": self.method, "pointer": self.pointer}
+        return {"method": self.method, "pointer": self.pointer, "value": self.value}
+
+
+@dataclass(frozen=True)
+class _Change:
+    tokens: tuple[str, ...]
+    value: Any
+    targetable: bool
+
+
+def _diff_tree(
+    prefix: tuple[str, ...],
+    current: dict[str, Any],
+    desired: dict[str, Any],
+    delete_missing: bool,
+    targetable: bool,
+) -> Iterable[_Change]:
+    for key, value in desired.items():
+        tokens = (*prefix, key)
+        # Keys containing '/' cannot be addressed by a path segment
+        can_target = targetable and "/" not in key
+        if key not in current:
+            yield _Change(tokens, value, can_target)
+        elif isinstance(value, dict) and isinstance(current[key], dict):
+            yield from _diff_tree(tokens, current[key], value, delete_missing, can_target)
+        elif current[key] != value:
+            yield _Change(tokens, value, can_target)
+
+    if delete_missing:
+        for key in current.keys() - desired.keys():
+            yield _Change((*prefix, key), _DELETED, targetable and "/" not in key)
+
+
+def _diff_features(current: dict[str, Any], desired: dict[str, Any], delete_missing: bool) -> Iterable[_Change]:
+    for feature_id, feature in desired.items():
+        existing = current.get(feature_id)
+        if not isinstance(feature, dict) or not isinstance(existing, dict) or "/" in feature_id:
+            if existing != feature:
+                yield _Change(("features", feature_id), feature, False)
+            continue
+
+        for section, value in feature.items():
+            tokens = ("features", feature_id, section)
+            if section in _TARGETED_FEATURE_SECTIONS and isinstance(value, dict):
+                yield from _diff_tree(tokens, existing.get(section) or {}, value, delete_missing, True)
+            elif existing.get(section) != value:
+                yield _Change(tokens, value, False)
+
+        if delete_missing:
+            for section in existing.keys() - feature.keys():
+                yield _Change(("features", feature_id, section), _DELETED, False)
+
+    if delete_missing:
+        for feature_id in current.keys() - desired.keys():
+            yield _Change(("features", feature_id), _DELETED, False)
+
+
+def _diff_thing(current: dict[str, Any], desired: dict[str, Any], delete_missing: bool) -> list[_Change]:
+    changes: list[_Change] = []
+    for key, value in desired.items():
+        if key == "thingId" or key.startswith("_"):
+            continue
+
+        existing = current.get(key)
+        if key == "attributes" and isinstance(value, dict) and isinstance(existing, dict):
+            changes.extend(_diff_tree(("attributes",), existing, value, delete_missing, True))
+        elif key == "features" and isinstance(value, dict) and isinstance(existing, dict):
+            changes.extend(_diff_features(existing, value, delete_missing))
+        elif existing != value:
+            changes.append(_Change((key,), value, False))
+    return changes
+
+
+def _merge_patch(changes: Iterable[_Change]) -> dict[str, Any]:
+    patch: dict[str, Any] = {}
+    for change in changes:
+        node = patch
+        for token in change.tokens[:-1]:
+            node = node.setdefault(token, {})
+        node[change.tokens[-1]] = None if change.value is _DELETED else change.value
+    return patch
+
+
+def _targeted(change: _Change) -> WriteOperation:
+    pointer = "/" + "/".join(change.tokens)
+    if change.value is _DELETED:
+        return WriteOperation("DELETE", pointer)
+    return WriteOperation("PUT", pointer, change.value)
+
+
+def _targeted_cost(change: _Change, request_overhead: int) -> int:
+    size = request_overhead + sum(len(token) + 1 for token in change.tokens)
+    if change.value is not _DELETED:
+        size += len(encode_json(change.value))
+    return size
+
+
+def plan_writes(
+    current: dict[str, Any],
+    desired: dict[str, Any],
+    delete_missing: bool = True,
+    request_overhead: int = DEFAULT_REQUEST_OVERHEAD,
+) -> list[WriteOperation]:
+    """Plan the smallest set of writes that turns the current thing into the desired thing.
+
+    Only the top-level keys present in `desired` are compared. Changes below `attributes`
+    and below the `properties`/`desiredProperties` of existing features can be written
+    through their own sub-resources; all other changes are sent as a JSON merge patch
+    on the thing. Targeted writes are preferred over the merge patch when their combined
+    size, including `request_overhead` per request, is smaller.
+
+    Args:
+        current: The current thing document
+        desired: The desired thing document
+        delete_missing: Delete keys that exist in `current` but not in `desired`
+        request_overhead: Estimated size in bytes of an additional request
+    """
+    changes = _diff_thing(current, desired, delete_missing)
+
+    merged = [change for change in changes if not change.targetable]
+    # Setting a JSON null cannot be expressed in a merge patch
+    forced = [change for change in changes if change.targetable and change.value is None]
+    optional = [change for change in changes if change.targetable and change.value is not None]
+
+    if optional:
+        # The merge patch request is only an extra request if nothing else needs it
+        base_cost = len(encode_json(_merge_patch(merged))) if merged else -request_overhead
+        merge_cost = len(encode_json(_merge_patch(merged + optional)))
+        targeted_cost = sum(_targeted_cost(change, request_overhead) for change in optional)
+        if merge_cost - base_cost < targeted_cost:
+            merged.extend(optional)
+        else:
+            forced.extend(optional)
+
+    operations = [_targeted(change) for change in forced]
+    if merged:
+        operations.insert(0, WriteOperation("PATCH", "", _merge_patch(merged)))
+    return operations
+
+
+def _selector(desired: dict[str, Any], delete_missing: bool) -> str:
+    fields: list[str] = []
+    for key, value in desired.items():
+        if key == "thingId" or key.startswith("_"):
+            continue
+        if not delete_missing and key in ("attributes", "features") and isinstance(value, dict) and value:
+            fields.extend(f"{key}/{name}" for name in value)
+        else:
+            fields.append(key)
+    return ",".join(fields)
+
+
+async def plan_thing_update(
+    client: DittoClient,
+    thing_id: str,
+    desired: dict[str, Any],
+    current: dict[str, Any] | None = None,
+    delete_missing: bool = True,
+    request_overhead: int = DEFAULT_REQUEST_OVERHEAD,
+) -> list[WriteOperation]:
+    """Plan the writes for a thing update, fetching only the affected parts of the current thing if needed.
+
+    When the thing does not exist yet, the plan is a single `PUT` of the desired document.
+    See `plan_writes` for the planning rules.
+    """
+    if current is None:
+        fields = _selector(desired, delete_missing)
+        if not fields:
+            return []
+
+        query_params = WithThingItemRequestBuilder.WithThingItemRequestBuilderGetQueryParameters()
+        query_params.fields = fields
+        builder = client.api.two.things.by_thing_id(thing_id)
+        request_info = builder.to_get_request_information(RequestConfiguration(query_parameters=query_params))
+        try:
+            current = await send_json(builder.request_adapter, request_info) or {}
+        except APIError as e:
+            if e.response_status_code != 404:
+                raise
+            return [WriteOperation("PUT", "", desired)]
+
+    return plan_writes(current, desired, delete_missing, request_overhead)
+
+
+async def apply_writes(
+    client: DittoClient,
+    thing_id: str,
+    operations: Iterable[WriteOperation],
+    concurrency: int = 8,
+) -> None:
+    """Execute planned writes, running independent writes concurrently.
+
+    Args:
+        client: The Ditto client
+        thing_id: The ID of the thing
+        operations: The operations returned by `plan_writes` or `plan_thing_update`
+        concurrency: Maximum number of concurrent requests
+    """
+
+    async def _apply(operation: WriteOperation) -> None:
+        builder = sub_resource_builder(client, thing_id, operation.pointer)
+        method = _METHODS[operation.method]
+        if method == Method.DELETE:
+            request_info = build_request(builder, method)
+        elif method == Method.PATCH:
+            request_info = build_request(
+                builder, method, body=operation.value, content_type="application/merge-patch+json"
+            )
+        else:
+            request_info = build_request(builder, method, body=operation.value)
+        await send_no_content(builder.request_adapter, request_info)
+
+    await gather_bounded((_apply(operation) for operation in operations), concurrency)
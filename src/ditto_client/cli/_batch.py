@@ -0,0 +1,73 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Annotated, cast
+
+import typer
+from typer import Context
+
+from ditto_client._types import CmdState
+from ditto_client.cli._output import capture_output, output_message
+from ditto_client.cli._runner import invoke, parse_line, shared_loop
+
+# (line number, arguments)
+_Line = tuple[int, list[str]]
+
+
+def _read_script(script: str) -> list[_Line]:
+    text = sys.stdin.read() if script == "-" else Path(script).read_text()
+
+    lines: list[_Line] = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        try:
+            args = parse_line(line)
+        except ValueError as e:
+            raise typer.BadParameter(f"Line {number}: {e}", param_hint="SCRIPT") from e
+        if args:
+            lines.append((number, args))
+    return lines
+
+
+def _invoke_captured(ctx: Context, state: CmdState, line: _Line) -> tuple[int, str, str]:
+    number, args = line
+    with capture_output() as (out, err):
+        code = invoke(ctx, state, args, f"Line {number}")
+    return code, out.getvalue(), err.getvalue()
+
+
+def batch(
+    ctx: Context,
+    script: Annotated[str, typer.Argument(help="File with one command per line, '-' for stdin")] = "-",
+    jobs: Annotated[int, typer.Option("--jobs", "-j", min=1, help="Number of commands to run in parallel")] = 1,
+    stop_on_error: Annotated[bool, typer.Option(help="Stop at the first command that fails")] = False,
+) -> None:
+    """Run many commands in one process, sharing the client and its connections.
+
+    One command per line without global options, e.g. 'thing get my.sensors:sensor-1'. Output keeps the script order.
+    """
+    state = cast(CmdState, ctx.obj)
+    lines = _read_script(script)
+
+    failed = 0
+    with shared_loop(state):
+        if jobs == 1:
+            for number, args in lines:
+                if invoke(ctx, state, args, f"Line {number}") != 0:
+                    failed += 1
+                    if stop_on_error:
+                        break
+        else:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                for code, out, err in executor.map(lambda line: _invoke_captured(ctx, state, line), lines):
+                    sys.stdout.write(out)
+                    sys.stdout.flush()
+                    sys.stderr.write(err)
+                    if code != 0:
+                        failed += 1
+                        if stop_on_error:
+                            executor.shutdown(cancel_futures=True)
+                            break
+
+    if failed:
+        output_message(f"{failed} of {len(lines)} command(s) failed", level="error")
+        raise typer.Exit(code=1)
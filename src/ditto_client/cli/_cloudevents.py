@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+from typing import Annotated, cast
+
+import typer
+from typer import Context, Typer
+
+from ditto_client._cloudevents import CloudEventsIngestor, read_ndjson_events
+from ditto_client._types import CmdState
+from ditto_client.cli._output import output_json, output_message
+
+cloudevents_app = Typer()
+
+
+@cloudevents_app.command()
+def send(
+    ctx: Context,
+    events_file: Annotated[
+        Path | None,
+        typer.Argument(help="Path to NDJSON file with CloudEvents or Ditto Protocol messages (default: stdin)"),
+    ] = None,
+    source: Annotated[str, typer.Option(help="CloudEvents source for plain Ditto Protocol messages")] = "ditto-client",
+    type: Annotated[
+        str, typer.Option(help="CloudEvents type for plain Ditto Protocol messages")
+    ] = "org.eclipse.ditto.protocol",
+    max_in_flight: Annotated[int, typer.Option(help="Maximum number of concurrent requests")] = 256,
+    concurrency: Annotated[int, typer.Option(help="Initial number of concurrent requests")] = 16,
+) -> None:
+    """Send CloudEvents read from an NDJSON file or stdin."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        ingestor = CloudEventsIngestor(state.client, max_in_flight=max_in_flight, initial_concurrency=concurrency)
+
+        if events_file is None:
+            report = await ingestor.ingest(read_ndjson_events(sys.stdin.buffer, source, type))
+        else:
+            with events_file.open("rb") as stream:
+                report = await ingestor.ingest(read_ndjson_events(stream, source, type))
+
+        output_json(report.to_dict())
+        if report.errors:
+            output_message(f"{len(report.errors)} event(s) failed", level="error")
+            raise typer.Exit(code=1)
+
+    state.run(_run())
@@ -0,0 +1,226 @@
+import asyncio
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from collections.abc import Callable
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Annotated, Any, NoReturn, TextIO, cast
+
+import typer
+from typer import Context
+from typer.core import TyperCommand, TyperGroup
+from typer.exceptions import TyperException
+from typer.models import TyperPath
+
+from ditto_client._forward import DAEMON_SOCKET_ENV, ENV_OPTIONS, default_socket_path
+from ditto_client._response_cache import ResponseCache
+from ditto_client._search_count import CountCache
+from ditto_client.cli._output import output_message, redirect_output
+from ditto_client.cli._runner import run_command, shared_loop
+from ditto_client.generated.ditto_client import DittoClient
+
+# The working directory of the client a command runs for
+_client_cwd: ContextVar[str | None] = ContextVar("client_cwd", default=None)
+
+
+class ClientPool:
+    """Warm clients with their response and count caches per base URL and auth identity, sharing one event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, cache_ttl: float) -> None:
+        self.loop = loop
+        self._cache_ttl = cache_ttl
+        self._clients: dict[tuple[str, ...], tuple[DittoClient, ResponseCache, CountCache]] = {}
+        self._lock = threading.Lock()
+
+    def client(
+        self, key: tuple[str, ...], create: Callable[[ResponseCache], DittoClient]
+    ) -> tuple[DittoClient, ResponseCache, CountCache]:
+        """Get the client and its caches for a key, creating them with `create` on first use."""
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                cache = ResponseCache(ttl=self._cache_ttl)
+                client = create(cache)
+                entry = (client, cache, CountCache(client))
+                self._clients[key] = entry
+            return entry
+
+
+class _ClientPath(TyperPath):
+    """A path parameter resolving relative paths against the working directory of the client."""
+
+    @classmethod
+    def of(cls, path: TyperPath) -> "_ClientPath":
+        return cls(
+            exists=path.exists,
+            file_okay=path.file_okay,
+            dir_okay=path.dir_okay,
+            writable=path.writable,
+            readable=path.readable,
+            resolve_path=path.resolve_path,
+            allow_dash=path.allow_dash,
+            path_type=path.type,
+        )
+
+    def convert(self, value: Any, param: Any, ctx: Any) -> Any:
+        cwd = _client_cwd.get()
+        if cwd is not None and isinstance(value, str) and value != "-":
+            value = os.path.join(cwd, value)
+        return super().convert(value, param, ctx)
+
+
+class _NoTerminal(TyperException):
+    exit_code = 2
+
+
+class _NoStdin(io.TextIOBase):
+    """Stands in for stdin in the daemon, which cannot read the input of its clients or prompt them."""
+
+    def readable(self) -> bool:
+        return True
+
+    @property
+    def buffer(self) -> "_NoStdin":
+        return self
+
+    def fileno(self) -> NoReturn:
+        raise _NoTerminal(
+            "Commands that read stdin or ask for confirmation cannot run in the daemon, "
+            f"pass a file or --confirm, or unset {DAEMON_SOCKET_ENV}"
+        )
+
+    def read(self, size: int | None = -1) -> NoReturn:
+        self.fileno()
+
+    def readline(self, size: int | None = -1, /) -> NoReturn:  # type: ignore[override]
+        self.fileno()
+
+
+def _prepare_commands(command: TyperCommand | TyperGroup) -> None:
+    """Make the path parameters of all commands resolve against the working directory of the client."""
+    for param in command.params:
+        if isinstance(param.type, TyperPath):
+            param.type = _ClientPath.of(param.type)
+    if isinstance(command, TyperGroup):
+        for subcommand in command.commands.values():
+            _prepare_commands(cast(TyperCommand | TyperGroup, subcommand))
+
+
+class _FrameStream(io.TextIOBase):
+    """A text stream sending every write as a frame to the client."""
+
+    def __init__(self, sock: socket.socket, lock: threading.Lock, name: str) -> None:
+        self._sock = sock
+        self._lock = lock
+        self._name = name
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            _send_frame(self._sock, self._lock, {self._name: text})
+        return len(text)
+
+
+def _send_frame(sock: socket.socket, lock: threading.Lock, frame: dict[str, Any]) -> None:
+    with lock:
+        sock.sendall(json.dumps(frame).encode("utf-8") + b"\n")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_DaemonServer"
+
+    def handle(self) -> None:
+        lock = threading.Lock()
+        try:
+            request = json.loads(self.rfile.readline())
+            env: dict[str, str] = request.get("env", {})
+            cwd = str(request["cwd"])
+            args = [arg for name, option in ENV_OPTIONS.items() if name in env for arg in (option, env[name])]
+            args += [str(arg) for arg in request["argv"]]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            _send_frame(self.connection, lock, {"err": f"[ERROR] Invalid request: {e}\n", "exit": 2})
+            return
+
+        out = cast(TextIO, _FrameStream(self.connection, lock, "out"))
+        err = cast(TextIO, _FrameStream(self.connection, lock, "err"))
+        token = _client_cwd.set(cwd)
+        try:
+            with redirect_output(out, err):
+                code = run_command(self.server.root, args, "ditto-client", self.server.pool)
+        finally:
+            _client_cwd.reset(token)
+        _send_frame(self.connection, lock, {"exit": code})
+
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, root: TyperGroup, pool: ClientPool) -> None:
+        self.root = root
+        self.pool = pool
+        super().__init__(str(path), _Handler)
+
+
+def _remove_stale_socket(path: Path) -> None:
+    if not path.exists():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            path.unlink()
+            return
+    output_message(f"A daemon is already listening on {path}", level="error")
+    raise typer.Exit(code=1)
+
+
+def _interrupt(signum: int, frame: Any) -> None:
+    raise KeyboardInterrupt
+
+
+def daemon(
+    ctx: Context,
+    socket_path: Annotated[
+        Path | None, typer.Option("--socket", help="Unix socket to listen on (default: in XDG_RUNTIME_DIR or /tmp)")
+    ] = None,
+    cache_ttl: Annotated[
+        float, typer.Option(help="Seconds fetched things and policies are reused for (0 disables the cache)")
+    ] = 0.0,
+) -> None:
+    """Keep clients warm and run the commands of CLIs with DITTO_DAEMON_SOCKET set to the socket."""
+    path = socket_path or default_socket_path()
+    _remove_stale_socket(path)
+
+    root = cast(TyperGroup, ctx.find_root().command)
+    _prepare_commands(root)
+    # Only the options sent by a client count, not the environment or .env of the daemon
+    for param in root.params:
+        param.envvar = None
+    sys.stdin = _NoStdin()
+
+    with shared_loop() as loop:
+        # Only the current user may connect
+        umask = os.umask(0o177)
+        try:
+            server = _DaemonServer(path, root, ClientPool(loop, cache_ttl))
+        finally:
+            os.umask(umask)
+        # Stop cleanly on SIGTERM too
+        signal.signal(signal.SIGTERM, _interrupt)
+        try:
+            output_message(f"Listening on {path}, run commands with {DAEMON_SOCKET_ENV}={path}")
+            sys.stdout.flush()
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            path.unlink(missing_ok=True)
@@ -3,8 +3,10 @@ from typer import Typer
 from .devops._config import config_app
 from .devops._connection import connection_app
 from .devops._logging import logging_app
+from .devops._piggyback import piggyback_app
 
 devops_app = Typer()
 devops_app.add_typer(connection_app, name="connection", help="Manage connections")
 devops_app.add_typer(config_app, name="config", help="Manage configuration")
 devops_app.add_typer(logging_app, name="logging", help="Manage logging")
+devops_app.add_typer(piggyback_app, name="piggyback", help="Send piggyback commands")
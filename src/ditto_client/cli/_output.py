@@ -1,12 +1,52 @@
 """Output utilities for CLI commands."""
 
+import io
 import json
 import sys
-from typing import Any, cast
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TextIO, cast
 
 from kiota_serialization_json.json_serialization_writer_factory import JsonSerializationWriterFactory
+from rich.cells import cell_len
 from rich.console import Console
+from rich.live import Live
 from rich.table import Table
+from rich.text import Text
+
+# Streams that replace stdout/stderr for commands running in the current context
+_stdout: ContextVar[TextIO | None] = ContextVar("stdout", default=None)
+_stderr: ContextVar[TextIO | None] = ContextVar("stderr", default=None)
+
+
+def stdout() -> TextIO:
+    """The stream command output is written to."""
+    return _stdout.get() or sys.stdout
+
+
+def stderr() -> TextIO:
+    """The stream command errors are written to."""
+    return _stderr.get() or sys.stderr
+
+
+@contextmanager
+def redirect_output(out: TextIO, err: TextIO) -> Iterator[None]:
+    """Send the output and errors of commands run in the current context, e.g. in a worker thread, to other streams."""
+    out_token, err_token = _stdout.set(out), _stderr.set(err)
+    try:
+        yield
+    finally:
+        _stdout.reset(out_token)
+        _stderr.reset(err_token)
+
+
+@contextmanager
+def capture_output() -> Iterator[tuple[io.StringIO, io.StringIO]]:
+    """Capture the output and errors of commands run in the current context."""
+    out, err = io.StringIO(), io.StringIO()
+    with redirect_output(out, err):
+        yield out, err
 
 
 def model_to_dict(model: Any) -> dict[str, Any]:
@@ -26,20 +66,120 @@ def model_to_dict(model: Any) -> dict[str, Any]:
 def output_json(data: Any) -> None:
     """Output data as JSON."""
     json_str = json.dumps(data, indent=2, default=str)
-    sys.stdout.write(f"{json_str}\n")
+    stdout().write(f"{json_str}\n")
 
 
-def output_table(title: str, columns: list[tuple[str, str, str]], rows: list[list[str]]) -> None:
-    """Output data as a rich table."""
+def output_ndjson(data: Any) -> None:
+    """Output data as a single line of JSON and flush it immediately."""
+    stream = stdout()
+    stream.write(f"{json.dumps(data, separators=(',', ':'), default=str)}\n")
+    stream.flush()
+
+
+def build_table(title: str, columns: list[tuple[str, str, str]], rows: list[list[str]]) -> Table:
+    """Build a rich table."""
     table = Table(title=title)
     for name, justify, style in columns:
         table.add_column(name, justify=cast("Any", justify), style=style, no_wrap=True)
 
     for row in rows:
         table.add_row(*row)
+    return table
+
+
+def output_table(title: str, columns: list[tuple[str, str, str]], rows: list[list[str]]) -> None:
+    """Output data as a rich table."""
+    console = Console(file=stdout())
+    console.print(build_table(title, columns, rows))
+
+
+class TableStream:
+    """A table printed in pages of fixed-width columns while its rows arrive.
+
+    Column widths are measured on the header and the first `sample_size` rows, which are held
+    back until the sample is complete or the stream is closed. Longer values of later rows are
+    cut off with an ellipsis. Each page of `page_size` rows is printed with its own header.
+
+    ```python
+    with TableStream("Things", [("Thing ID", "left", "cyan")]) as table:
+        async for thing in things:
+            table.add_row([thing["thingId"]])
+    ```
+    """
+
+    def __init__(
+        self,
+        title: str,
+        columns: list[tuple[str, str, str]],
+        page_size: int = 100,
+        sample_size: int = 50,
+        max_width: int = 60,
+    ) -> None:
+        self._console = Console(file=stdout())
+        self._title = title
+        self._columns = columns
+        self._page_size = page_size
+        self._sample_size = sample_size
+        self._max_width = max_width
+        self._widths: list[int] | None = None
+        self._rows: list[list[str]] = []
+        self._pages = 0
+
+    def add_row(self, row: list[str]) -> None:
+        """Add a row, printing the rows held back once a page is full."""
+        self._rows.append(row)
+        if self._widths is None:
+            if len(self._rows) < self._sample_size:
+                return
+            self._widths = self._measure()
+        while len(self._rows) >= self._page_size:
+            self._print_page(self._rows[: self._page_size])
+            del self._rows[: self._page_size]
+
+    def close(self) -> None:
+        """Print the remaining rows, or an empty table if there were none."""
+        if self._rows or self._pages == 0:
+            self._print_page(self._rows)
+            self._rows = []
+
+    def _measure(self) -> list[int]:
+        widths = [cell_len(name) for name, _, _ in self._columns]
+        for row in self._rows:
+            widths = [max(width, cell_len(value)) for width, value in zip(widths, row, strict=False)]
+        widths = [min(width, self._max_width) for width in widths]
+        # Narrow the widest columns until the table fits the console, with 3 cells of border per column
+        available = self._console.width - 3 * len(widths) - 1
+        while sum(widths) > available and max(widths) > 1:
+            widest = widths.index(max(widths))
+            widths[widest] -= 1
+        return widths
+
+    def _print_page(self, rows: list[list[str]]) -> None:
+        # Streams closed before the sample was complete are measured on their remaining rows
+        if self._widths is None:
+            self._widths = self._measure()
+        table = Table(title=self._title if self._pages == 0 else None)
+        for (name, justify, style), width in zip(self._columns, self._widths, strict=True):
+            table.add_column(
+                name, justify=cast("Any", justify), style=style, width=width, no_wrap=True, overflow="ellipsis"
+            )
+        for row in rows:
+            # Values are data, not rich markup
+            table.add_row(*(Text(value) for value in row))
+        self._console.print(table)
+        self._console.file.flush()
+        self._pages += 1
+
+    def __enter__(self) -> "TableStream":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
 
-    console = Console(file=sys.stdout)
-    console.print(table)
+def live_output() -> Live:
+    """Create a live display on stdout that is redrawn with `update`."""
+    return Live(console=Console(file=stdout()), auto_refresh=False, transient=False)
 
 
 def output_message(message: str, level: str = "info") -> None:
@@ -53,6 +193,6 @@ def output_message(message: str, level: str = "info") -> None:
     formatted_message = f"[{level_upper}] {message}\n"
 
     if level == "error":
-        sys.stderr.write(formatted_message)
+        stderr().write(formatted_message)
     else:
-        sys.stdout.write(formatted_message)
+        stdout().write(formatted_message)
@@ -1,4 +1,3 @@
-import asyncio
 import json
 from pathlib import Path
 from typing import Annotated, cast
@@ -40,4 +39,4 @@ def check(
         else:
             output_message("No permission check results returned", level="warning")
 
-    asyncio.run(_run())
+    state.run(_run())
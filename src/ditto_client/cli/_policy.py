@@ -1,4 +1,3 @@
-import asyncio
 import json
 from pathlib import Path
 from typing import Annotated, cast
@@ -6,6 +5,13 @@ from typing import Annotated, cast
 import typer
 from typer import Context, Typer
 
+from ditto_client._policies import (
+    apply_policy_writes,
+    load_policy_documents,
+    plan_policy_update,
+    policy_content,
+    sync_policies,
+)
 from ditto_client._types import CmdState
 from ditto_client.cli._output import model_to_dict, output_json, output_message
 from ditto_client.generated.models.new_policy import NewPolicy
@@ -38,7 +44,51 @@ def create(
         else:
             output_message(f"Failed to create policy '{policy_id}'", level="error")
 
-    asyncio.run(_run())
+    state.run(_run())
+
+
+@policy_app.command()
+def apply(
+    ctx: Context,
+    policy_dir: Annotated[Path, typer.Argument(help="Directory with one JSON file per policy")],
+    concurrency: Annotated[int, typer.Option(help="Maximum number of concurrent requests")] = 16,
+    dry_run: Annotated[bool, typer.Option(help="Only print which policies would be written")] = False,
+) -> None:
+    """Create or update the policies of a directory, writing only the changed ones."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        policies = load_policy_documents(policy_dir)
+        if not policies:
+            output_message(f"No policy files found in '{policy_dir}'", level="warning")
+            return
+
+        report = await sync_policies(state.client, policies, concurrency=concurrency, dry_run=dry_run)
+        output_json(report.to_dict())
+
+    state.run(_run())
+
+
+@policy_app.command()
+def update(
+    ctx: Context,
+    policy_id: Annotated[str, typer.Argument(help="The ID of the policy to update")],
+    policy_file: Annotated[Path, typer.Argument(help="Path to JSON file containing the desired policy or its entries")],
+    dry_run: Annotated[bool, typer.Option(help="Only print the planned writes")] = False,
+) -> None:
+    """Update a policy by writing only the changed entries, subjects and resources."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        desired = policy_content(json.loads(policy_file.read_text()))
+
+        writes = await plan_policy_update(state.client, policy_id, desired)
+        if not dry_run and writes:
+            await apply_policy_writes(state.client, policy_id, writes)
+
+        output_json([write.to_dict() for write in writes])
+
+    state.run(_run())
 
 
 @policy_app.command()
@@ -58,7 +108,7 @@ def get(
 
         output_json(model_to_dict(response))
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @policy_app.command()
@@ -78,7 +128,7 @@ def entries(
 
         output_json(model_to_dict(response))
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @policy_app.command()
@@ -99,4 +149,4 @@ def delete(
         await state.client.api.two.policies.by_policy_id(policy_id).delete()
         output_message(f"Successfully deleted policy '{policy_id}'", level="success")
 
-    asyncio.run(_run())
+    state.run(_run())
@@ -0,0 +1,92 @@
+"""Running CLI command lines within one process, e.g. for batch scripts and the shell."""
+
+import asyncio
+import shlex
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, cast
+
+import typer
+from typer import Context
+from typer.core import TyperCommand, TyperGroup
+from typer.exceptions import TyperException
+
+from ditto_client._types import CmdState
+from ditto_client.cli._output import output_message
+
+# Commands that run other commands and cannot be nested
+SESSION_COMMANDS = frozenset({"batch", "shell", "daemon"})
+
+
+def parse_line(line: str) -> list[str]:
+    """Split a command line like a shell, dropping comments and a leading `ditto-client`.
+
+    Raises:
+        ValueError: If the line has unbalanced quotes
+    """
+    args = shlex.split(line, comments=True)
+    # Allow lines copied from shell scripts
+    if args and args[0] == "ditto-client":
+        args = args[1:]
+    return args
+
+
+def invoke(ctx: Context, state: CmdState, args: list[str], location: str = "") -> int:
+    """Run a command line of the root command below `ctx` and return its exit code.
+
+    Errors are reported like the CLI does, prefixed with `location` (e.g. a line number).
+    """
+    prefix = f"{location}: " if location else ""
+    root = cast(TyperGroup, ctx.find_root().command)
+    command = root.get_command(ctx, args[0]) if args[0] not in SESSION_COMMANDS else None
+    if command is None:
+        output_message(f"{prefix}unknown command '{args[0]}'", level="error")
+        return 2
+
+    return run_command(cast(TyperCommand | TyperGroup, command), args[1:], f"ditto-client {args[0]}", state, prefix)
+
+
+def run_command(command: TyperCommand | TyperGroup, args: list[str], prog_name: str, obj: Any, prefix: str = "") -> int:
+    """Run a command with arguments without exiting the process and return its exit code."""
+    try:
+        # Without standalone mode, the exit code of typer.Exit is returned
+        result = command.main(args, prog_name=prog_name, standalone_mode=False, obj=obj)
+    except typer.Exit as e:
+        return e.exit_code
+    except typer.Abort:
+        output_message(f"{prefix}aborted", level="error")
+        return 1
+    except TyperException as e:
+        output_message(f"{prefix}{e.format_message()}", level="error")
+        return e.exit_code
+    except Exception as e:
+        output_message(f"{prefix}{type(e).__name__}: {e}", level="error")
+        return 1
+    return result if isinstance(result, int) else 0
+
+
+async def _cancel_tasks() -> None:
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@contextmanager
+def shared_loop(state: CmdState | None = None) -> Iterator[asyncio.AbstractEventLoop]:
+    """Run an event loop in a background thread, which all commands of `state` run on."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="ditto-client-loop", daemon=True)
+    thread.start()
+    if state is not None:
+        state.loop = loop
+    try:
+        yield loop
+    finally:
+        if state is not None:
+            state.loop = None
+        asyncio.run_coroutine_threadsafe(_cancel_tasks(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -1,60 +1,119 @@
-import asyncio
-from typing import Annotated, cast
+import json
+import logging
+import re
+from collections.abc import AsyncIterator
+from typing import Annotated, Any, cast
 
 import typer
 from kiota_abstractions.base_request_configuration import RequestConfiguration
 from typer import Context, Typer
 
+from ditto_client._rql import RQLSyntaxError, parse_filter
+from ditto_client._search_count import count_groups
 from ditto_client._types import CmdState
-from ditto_client.cli._output import model_to_dict, output_json
-from ditto_client.generated.api.two.search.things.count.count_request_builder import CountRequestBuilder
+from ditto_client.cli._output import TableStream, model_to_dict, output_json, output_table
 from ditto_client.generated.api.two.search.things.things_request_builder import ThingsRequestBuilder
+from ditto_client.generated.models.search_result_things import SearchResultThings
+
+logger = logging.getLogger(__name__)
+
+_CURSOR_OPTION = re.compile(r",?cursor\([^)]*\)")
 
 search_app = Typer()
 
 
+def _check_filter(value: str | list[str] | None) -> str | list[str] | None:
+    """Validate RQL filters locally and warn about filters that are expensive to evaluate."""
+    for filter in [value] if isinstance(value, str) else value or []:
+        try:
+            query = parse_filter(filter)
+        except RQLSyntaxError as error:
+            raise typer.BadParameter(str(error)) from error
+        for warning in query.warnings():
+            logger.warning(warning)
+    return value
+
+
+def _thing_row(thing: dict[str, Any]) -> list[str]:
+    attributes = thing.get("attributes")
+    return [
+        thing.get("thingId", ""),
+        thing.get("policyId", ""),
+        thing.get("definition") or "",
+        json.dumps(attributes, separators=(",", ":")) if attributes else "",
+    ]
+
+
+def _with_cursor(option: str | None, cursor: str) -> str:
+    """Search options continuing at a cursor, replacing a cursor given in `option`."""
+    option = _CURSOR_OPTION.sub("", option or "").strip(",")
+    return f"{option},cursor({cursor})" if option else f"cursor({cursor})"
+
+
 @search_app.command()
 def query(
     ctx: Context,
     filter: Annotated[
         str | None,
-        typer.Option(help="RQL filter expression (e.g., 'eq(attributes/location,\"kitchen\")')"),
+        typer.Option(
+            help="RQL filter expression (e.g., 'eq(attributes/location,\"kitchen\")')", callback=_check_filter
+        ),
     ] = None,
     fields: Annotated[str | None, typer.Option(help="Comma-separated list of fields to include")] = None,
     namespaces: Annotated[str | None, typer.Option(help="Comma-separated list of namespaces to search")] = None,
     option: Annotated[str | None, typer.Option(help="Search options (e.g., 'size(10),sort(+thingId)')")] = None,
     timeout: Annotated[str | None, typer.Option(help="Request timeout (e.g., '30s', '1m')")] = None,
+    all_pages: Annotated[
+        bool, typer.Option("--all", help="Follow the cursor over all pages of results, not only the first")
+    ] = False,
 ) -> None:
-    """Search for things in Ditto."""
+    """Search for things in Ditto.
+
+    With --table, the results are printed page by page while they arrive.
+    """
     state = cast(CmdState, ctx.obj)
 
     async def _run() -> None:
-        # Build query parameters if provided
-        request_config = None
-        if filter or fields or namespaces or option or timeout:
-            query_params = ThingsRequestBuilder.ThingsRequestBuilderGetQueryParameters()
-            if filter:
-                query_params.filter = filter
-            if fields:
-                query_params.fields = fields
-            if namespaces:
-                query_params.namespaces = namespaces
-            if option:
-                query_params.option = option
-            if timeout:
-                query_params.timeout = timeout
-
-            request_config = RequestConfiguration(query_parameters=query_params)
-
-        response = await state.client.api.two.search.things.get(request_configuration=request_config)
-
-        if not response or not response.items:
-            output_json([])
+        query_params = ThingsRequestBuilder.ThingsRequestBuilderGetQueryParameters()
+        if filter:
+            query_params.filter = filter
+        if fields:
+            query_params.fields = fields
+        if namespaces:
+            query_params.namespaces = namespaces
+        if option:
+            query_params.option = option
+        if timeout:
+            query_params.timeout = timeout
+        request_config = RequestConfiguration(query_parameters=query_params)
+
+        async def _pages() -> AsyncIterator[SearchResultThings]:
+            response = await state.client.api.two.search.things.get(request_configuration=request_config)
+            while response:
+                yield response
+                if not all_pages or not response.cursor:
+                    return
+                query_params.option = _with_cursor(option, response.cursor)
+                response = await state.client.api.two.search.things.get(request_configuration=request_config)
+
+        if state.table:
+            with TableStream(
+                title="Things",
+                columns=[
+                    ("Thing ID", "left", "cyan"),
+                    ("Policy ID", "left", "green"),
+                    ("Definition", "left", "yellow"),
+                    ("Attributes", "left", "blue"),
+                ],
+            ) as table:
+                async for page in _pages():
+                    for thing in page.items or []:
+                        table.add_row(_thing_row(model_to_dict(thing)))
             return
 
-        output_json([model_to_dict(thing) for thing in response.items])
+        output_json([model_to_dict(thing) async for page in _pages() for thing in page.items or []])
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @search_app.command()
@@ -62,26 +121,60 @@ def count(
     ctx: Context,
     filter: Annotated[
         str | None,
-        typer.Option(help="RQL filter expression (e.g., 'eq(attributes/location,\"kitchen\")')"),
+        typer.Option(
+            help="RQL filter expression (e.g., 'eq(attributes/location,\"kitchen\")')", callback=_check_filter
+        ),
     ] = None,
     namespaces: Annotated[str | None, typer.Option(help="Comma-separated list of namespaces to search")] = None,
+    group_by: Annotated[
+        str | None, typer.Option(help="Count each of the given namespaces separately ('namespace')")
+    ] = None,
+    bucket: Annotated[
+        list[str] | None,
+        typer.Option(
+            help="RQL filter to count separately, combined with --filter (repeatable)", callback=_check_filter
+        ),
+    ] = None,
+    concurrency: Annotated[int, typer.Option(help="Maximum number of concurrent requests")] = 16,
 ) -> None:
     """Count things in Ditto."""
     state = cast(CmdState, ctx.obj)
 
-    async def _run() -> None:
-        # Build query parameters if provided
-        request_config = None
-        if filter or namespaces:
-            query_params = CountRequestBuilder.CountRequestBuilderGetQueryParameters()
-            if filter:
-                query_params.filter = filter
-            if namespaces:
-                query_params.namespaces = namespaces
+    if group_by not in (None, "namespace"):
+        raise typer.BadParameter("Only 'namespace' is supported", param_hint="--group-by")
+    namespace_list = [namespace.strip() for namespace in namespaces.split(",")] if namespaces else []
+    if group_by and not namespace_list:
+        raise typer.BadParameter("Requires the namespaces to count in", param_hint="--namespaces")
 
-            request_config = RequestConfiguration(query_parameters=query_params)
+    async def _run() -> None:
+        if group_by or bucket:
+            rows = await count_groups(
+                state.client,
+                namespaces=namespace_list,
+                filters=bucket,
+                base_filter=filter,
+                group_by_namespace=group_by == "namespace",
+                concurrency=concurrency,
+                cache=state.count_cache,
+            )
+            if not state.table:
+                output_json(rows)
+                return
+
+            columns = []
+            if group_by:
+                columns.append(("Namespace", "left", "cyan"))
+            if bucket:
+                columns.append(("Filter", "left", "yellow"))
+            columns.append(("Count", "right", "green"))
+            output_table(
+                title="Thing Counts",
+                columns=columns,
+                rows=[[str(value) for value in row.values()] for row in rows],
+            )
+            return
 
-        response = await state.client.api.two.search.things.count.get(request_configuration=request_config)
-        output_json({"count": response})
+        # Counts are reused by later commands of a session, e.g. in the shell
+        output_json({"count": await state.count_cache.count(filter, namespace_list)})
 
-    asyncio.run(_run())
+    state.run(_run())
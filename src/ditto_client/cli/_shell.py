@@ -0,0 +1,194 @@
+import asyncio
+import bisect
+import logging
+import os
+import shlex
+from pathlib import Path
+from typing import Annotated, Any, cast
+
+import typer
+from kiota_abstractions.base_request_configuration import RequestConfiguration
+from kiota_abstractions.method import Method
+from typer import Context
+from typer.core import TyperGroup
+
+from ditto_client._raw import build_request, send_json
+from ditto_client._types import CmdState
+from ditto_client.cli._output import output_message, stdout
+from ditto_client.cli._runner import SESSION_COMMANDS, invoke, parse_line, shared_loop
+from ditto_client.generated.api.two.search.things.things_request_builder import ThingsRequestBuilder
+from ditto_client.generated.ditto_client import DittoClient
+
+try:
+    import readline
+except ImportError:  # e.g. on Windows
+    readline = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_BUILTINS = {"help": "Show the available commands", "exit": "Leave the shell", "quit": "Leave the shell"}
+_MAX_COMPLETIONS = 200
+
+
+def _history_file() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "ditto-client" / "shell_history"
+
+
+class _IdIndex:
+    """Thing and policy IDs for completion, refreshed from the search in the background."""
+
+    def __init__(self, limit: int) -> None:
+        self._limit = limit
+        self.thing_ids: list[str] = []
+        self.policy_ids: list[str] = []
+
+    async def refresh(self, client: DittoClient) -> None:
+        builder = client.api.two.search.things
+        thing_ids: set[str] = set()
+        policy_ids: set[str] = set()
+        cursor: str | None = None
+        while len(thing_ids) < self._limit:
+            query_params = ThingsRequestBuilder.ThingsRequestBuilderGetQueryParameters()
+            query_params.fields = "thingId,policyId"
+            query_params.option = "size(200)" + (f",cursor({cursor})" if cursor else "")
+            request_info = build_request(builder, Method.GET, RequestConfiguration(query_parameters=query_params))
+            page: dict[str, Any] = await send_json(builder.request_adapter, request_info) or {}
+            for item in page.get("items", []):
+                thing_ids.add(item.get("thingId", ""))
+                policy_ids.add(item.get("policyId", ""))
+            cursor = page.get("cursor")
+            if not cursor:
+                break
+        # Replaced at once, the completer reads them from another thread
+        self.thing_ids = sorted(thing_ids - {""})
+        self.policy_ids = sorted(policy_ids - {""})
+
+    async def run(self, client: DittoClient, interval: float) -> None:
+        while True:
+            try:
+                await self.refresh(client)
+            except Exception as e:
+                logger.debug("Refreshing the ID index failed: %s", e)
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def complete(ids: list[str], prefix: str) -> list[str]:
+        start = bisect.bisect_left(ids, prefix)
+        matches: list[str] = []
+        for value in ids[start : start + _MAX_COMPLETIONS]:
+            if not value.startswith(prefix):
+                break
+            matches.append(value)
+        return matches
+
+
+class _Completer:
+    """Completes command names, options and thing/policy IDs."""
+
+    def __init__(self, ctx: Context, index: _IdIndex) -> None:
+        self._ctx = ctx
+        self._root = cast(TyperGroup, ctx.find_root().command)
+        self._index = index
+        self._matches: list[str] = []
+
+    def candidates(self, words: list[str], text: str) -> list[str]:
+        command: Any = self._root
+        for word in words:
+            sub = command.get_command(self._ctx, word) if isinstance(command, TyperGroup) else None
+            if sub is None:
+                break
+            command = sub
+
+        if text.startswith("-"):
+            options = [option for param in command.params for option in param.opts if option.startswith("--")]
+            return sorted(option for option in options if option.startswith(text))
+        if isinstance(command, TyperGroup):
+            names = command.list_commands(self._ctx)
+            if command is self._root:
+                names = [name for name in names if name not in SESSION_COMMANDS] + list(_BUILTINS)
+            return sorted(name for name in names if name.startswith(text))
+        ids = self._index.policy_ids if words[:1] == ["policy"] else self._index.thing_ids
+        return self._index.complete(ids, text)
+
+    def __call__(self, text: str, state: int) -> str | None:
+        if state == 0:
+            assert readline is not None
+            line = readline.get_line_buffer()[: readline.get_begidx()]
+            try:
+                words = shlex.split(line)
+            except ValueError:
+                words = line.split()
+            self._matches = self.candidates(words, text)
+        return self._matches[state] if state < len(self._matches) else None
+
+
+def _print_help(ctx: Context) -> None:
+    root = cast(TyperGroup, ctx.find_root().command)
+    commands = {name: root.get_command(ctx, name) for name in root.list_commands(ctx) if name not in SESSION_COMMANDS}
+    rows = [(name, command.get_short_help_str()) for name, command in commands.items() if command is not None]
+    rows += list(_BUILTINS.items())
+    width = max(len(name) for name, _ in rows)
+    for name, help in rows:
+        stdout().write(f"  {name.ljust(width)}  {help}\n")
+    stdout().write("\nRun '<command> --help' for the options of a command.\n")
+
+
+def shell(
+    ctx: Context,
+    cache_ttl: Annotated[
+        float, typer.Option(help="Seconds fetched things and policies are reused for (0 disables the cache)")
+    ] = 30.0,
+    refresh: Annotated[float, typer.Option(help="Seconds between refreshes of the IDs used for completion")] = 300.0,
+    index_limit: Annotated[int, typer.Option(help="Maximum number of thing IDs used for completion")] = 10000,
+) -> None:
+    """Start an interactive shell that keeps the client, its connections and caches between commands."""
+    state = cast(CmdState, ctx.obj)
+    state.cache.ttl = cache_ttl
+    index = _IdIndex(index_limit)
+    history = _history_file()
+
+    if readline is not None:
+        readline.set_completer(_Completer(ctx, index))
+        readline.set_completer_delims(" \t\n")
+        readline.parse_and_bind("tab: complete")
+        try:
+            readline.read_history_file(history)
+        except OSError:
+            pass
+
+    with shared_loop(state) as loop:
+        refresher = asyncio.run_coroutine_threadsafe(index.run(state.client, refresh), loop)
+        try:
+            while True:
+                try:
+                    line = input("ditto> ")
+                except EOFError:
+                    stdout().write("\n")
+                    break
+                except KeyboardInterrupt:
+                    stdout().write("\n")
+                    continue
+
+                try:
+                    args = parse_line(line)
+                except ValueError as e:
+                    output_message(str(e), level="error")
+                    continue
+                if not args:
+                    continue
+                if args[0] in ("exit", "quit"):
+                    break
+                if args[0] == "help":
+                    _print_help(ctx)
+                    continue
+
+                try:
+                    invoke(ctx, state, args)
+                except KeyboardInterrupt:
+                    output_message("Interrupted", level="error")
+        finally:
+            refresher.cancel()
+            if readline is not None:
+                history.parent.mkdir(parents=True, exist_ok=True)
+                readline.write_history_file(history)
@@ -1,4 +1,3 @@
-import asyncio
 import json
 from pathlib import Path
 from typing import Annotated, Any, cast
@@ -8,7 +7,10 @@ import typer
 from kiota_abstractions.base_request_configuration import RequestConfiguration
 from typer import Context, Typer
 
+from ditto_client._history import iter_history
+from ditto_client._properties import get_value
 from ditto_client._types import CmdState
+from ditto_client._write_planner import apply_writes, plan_thing_update
 from ditto_client.cli._output import (
     model_to_dict,
     output_json,
@@ -20,6 +22,8 @@ from ditto_client.generated.models.patch_thing import PatchThing
 from ditto_client.generated.models.thing import Thing
 
 thing_app = Typer()
+prop_app = Typer()
+thing_app.add_typer(prop_app, name="prop", help="Single attribute and property access")
 
 
 @thing_app.command()
@@ -41,7 +45,7 @@ def create(
         await state.client.api.two.things.by_thing_id(thing_id).put(body=new_thing)
         output_message(f"Successfully created thing '{thing_id}'", level="success")
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @thing_app.command()
@@ -83,7 +87,7 @@ def list(
 
         output_json([model_to_dict(thing) for thing in response])
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @thing_app.command()
@@ -110,7 +114,7 @@ def get(
 
         output_json(model_to_dict(response))
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @thing_app.command()
@@ -132,7 +136,33 @@ def update(
         await state.client.api.two.things.by_thing_id(thing_id).patch(body=patch_thing)
         output_message(f"Successfully updated thing '{thing_id}'", level="success")
 
-    asyncio.run(_run())
+    state.run(_run())
+
+
+@thing_app.command()
+def sync(
+    ctx: Context,
+    thing_id: Annotated[str, typer.Argument(help="The ID of the thing to update")],
+    thing_file: Annotated[Path, typer.Argument(help="Path to JSON file containing the desired thing")],
+    keep_missing: Annotated[
+        bool,
+        typer.Option(help="Keep attributes, features and properties that are missing from the desired thing"),
+    ] = False,
+    dry_run: Annotated[bool, typer.Option(help="Only print the planned writes")] = False,
+) -> None:
+    """Update a thing with the smallest set of writes needed to reach the desired state."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        desired = json.loads(thing_file.read_text())
+
+        operations = await plan_thing_update(state.client, thing_id, desired, delete_missing=not keep_missing)
+        if not dry_run and operations:
+            await apply_writes(state.client, thing_id, operations)
+
+        output_json([operation.to_dict() for operation in operations])
+
+    state.run(_run())
 
 
 @thing_app.command()
@@ -193,7 +223,38 @@ def diff(
         else:
             output_json({"diff": [model_to_dict(op) for op in patch]})
 
-    asyncio.run(_run())
+    state.run(_run())
+
+
+@thing_app.command()
+def history(
+    ctx: Context,
+    thing_id: Annotated[str, typer.Argument(help="The ID of the thing")],
+    from_rev: Annotated[int, typer.Option("--from-rev", help="First revision of the timeline (inclusive)")],
+    to_rev: Annotated[int, typer.Option("--to-rev", help="Last revision of the timeline (inclusive)")],
+    fields: Annotated[
+        str | None,
+        typer.Option(
+            "--fields", "-f", help="Comma-separated list of fields to track (e.g., 'attributes,features/lamp')"
+        ),
+    ] = None,
+    window: Annotated[int, typer.Option(help="Maximum number of concurrent historical fetches")] = 16,
+) -> None:
+    """Show the per-revision changes of a thing over a range of revisions."""
+    if from_rev > to_rev:
+        output_message("--from-rev must not be greater than --to-rev", level="error")
+        raise typer.Exit(code=1)
+
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        timeline = [
+            delta.to_dict()
+            async for delta in iter_history(state.client, thing_id, from_rev, to_rev, fields=fields, window=window)
+        ]
+        output_json(timeline)
+
+    state.run(_run())
 
 
 @thing_app.command()
@@ -214,4 +275,28 @@ def delete(
         await state.client.api.two.things.by_thing_id(thing_id).delete()
         output_message(f"Successfully deleted thing '{thing_id}'", level="success")
 
-    asyncio.run(_run())
+    state.run(_run())
+
+
+@prop_app.command("get")
+def prop_get(
+    ctx: Context,
+    thing_id: Annotated[str, typer.Argument(help="The ID of the thing")],
+    pointer: Annotated[
+        str,
+        typer.Argument(help="Path of the value (e.g., 'attributes/location', 'features/temperature/properties/value')"),
+    ],
+) -> None:
+    """Get a single attribute or feature property value."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        try:
+            value = await get_value(state.client, thing_id, pointer)
+        except ValueError as e:
+            output_message(str(e), level="error")
+            raise typer.Exit(code=1) from e
+
+        output_json(value)
+
+    state.run(_run())
@@ -1,8 +1,10 @@
-import asyncio
-from typing import cast
+from pathlib import Path
+from typing import Annotated, Any, cast
 
+import typer
 from typer import Context, Typer
 
+from ditto_client._devops import ConfigSnapshotStore, config_drift, diff_configs, fetch_pod_configs
 from ditto_client._types import CmdState
 from ditto_client.cli._output import model_to_dict, output_json, output_message
 
@@ -23,4 +25,73 @@ def get(ctx: Context) -> None:
 
         output_json(model_to_dict(response))
 
-    asyncio.run(_run())
+    state.run(_run())
+
+
+@config_app.command()
+def snapshot(
+    ctx: Context,
+    pods: Annotated[list[str] | None, typer.Argument(help="Pods as 'module/pod' (default: all pods)")] = None,
+    path: Annotated[str | None, typer.Option(help="Only store the configuration below this path")] = None,
+    snapshot_dir: Annotated[Path | None, typer.Option(help="Directory to store snapshots in")] = None,
+) -> None:
+    """Store the configuration of service pods on disk."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        store = ConfigSnapshotStore(snapshot_dir)
+        configs = await fetch_pod_configs(state.client, pods, path=path)
+        output_json({pod: store.save(pod, config, path=path) for pod, config in configs.items()})
+
+    state.run(_run())
+
+
+@config_app.command()
+def diff(
+    ctx: Context,
+    left: Annotated[str, typer.Argument(help="'module/pod' for the live config or 'module/pod@latest|<timestamp>'")],
+    right: Annotated[str | None, typer.Argument(help="Same as left (default: the live config of the left pod)")] = None,
+    path: Annotated[str | None, typer.Option(help="Only compare the configuration below this path")] = None,
+    snapshot_dir: Annotated[Path | None, typer.Option(help="Directory snapshots are stored in")] = None,
+) -> None:
+    """Show only the configuration values that differ between two pods or snapshots."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        store = ConfigSnapshotStore(snapshot_dir)
+        sides = [left, right or left.partition("@")[0]]
+        if right is None and "@" not in left:
+            sides[0] = f"{left}@latest"
+
+        live = [side for side in sides if "@" not in side]
+        configs: dict[str, Any] = await fetch_pod_configs(state.client, live, path=path) if live else {}
+
+        def _config(side: str) -> Any:
+            pod, _, timestamp = side.partition("@")
+            return store.load(pod, timestamp, path) if timestamp else configs[pod]
+
+        try:
+            deltas = diff_configs(_config(sides[0]), _config(sides[1]))
+        except LookupError as e:
+            output_message(str(e), level="error")
+            raise typer.Exit(code=1) from e
+
+        output_json([delta.to_dict() for delta in deltas])
+
+    state.run(_run())
+
+
+@config_app.command()
+def drift(
+    ctx: Context,
+    path: Annotated[str | None, typer.Option(help="Only compare the configuration below this path")] = None,
+) -> None:
+    """Show the configuration values in which pods differ from the other pods of their service."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        configs = await fetch_pod_configs(state.client, path=path)
+        differences = config_drift(configs)
+        output_json({pod: [delta.to_dict() for delta in deltas] for pod, deltas in differences.items()})
+
+    state.run(_run())
@@ -1,5 +1,7 @@
 import asyncio
+import builtins
 import json
+import re
 from pathlib import Path
 from typing import Annotated, Any, cast
 
@@ -7,11 +9,26 @@ import typer
 from kiota_abstractions.base_request_configuration import RequestConfiguration
 from typer import Context, Typer
 
+from ditto_client._connections import (
+    ConnectionHealth,
+    ConnectionRates,
+    enable_connection_logs,
+    fetch_connection_logs,
+    fetch_connection_metrics,
+    fetch_connection_status,
+    follow_connection_logs,
+    iter_connection_status,
+    list_connection_ids,
+    watch_connection_metrics,
+)
 from ditto_client._types import CmdState
 from ditto_client.cli._output import (
+    TableStream,
+    build_table,
+    live_output,
     output_json,
     output_message,
-    output_table,
+    output_ndjson,
 )
 from ditto_client.generated.api.two.connections.connections_request_builder import ConnectionsRequestBuilder
 from ditto_client.generated.api.two.connections.item.with_connection_item_request_builder import (
@@ -21,6 +38,20 @@ from ditto_client.generated.models.new_connection import NewConnection
 
 connection_app = Typer()
 
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration(value: str) -> float:
+    """Parse a duration like '5s', '500ms' or '1m' into seconds; plain numbers are seconds."""
+    match = _DURATION.match(str(value))
+    if match is None:
+        raise typer.BadParameter(f"Invalid duration '{value}', use e.g. '5s', '500ms' or '1m'")
+    seconds = float(match.group(1)) * _DURATION_UNITS[match.group(2) or "s"]
+    if seconds <= 0:
+        raise typer.BadParameter("The duration must be positive")
+    return seconds
+
 
 def _connection_to_dict(connection: Any) -> dict[str, Any]:
     """Convert a Connection object to a dictionary."""
@@ -57,7 +88,7 @@ def create(
         await state.client.api.two.connections.by_connection_id(connection_id).put(body=new_connection)
         output_message(f"Successfully created connection '{connection_id}'", level="success")
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @connection_app.command()
@@ -92,18 +123,8 @@ def list(
             return
 
         if use_table:
-            rows = []
-            for connection in response:
-                rows.append(
-                    [
-                        connection.id or "",
-                        connection.connection_status or "",
-                        connection.connection_type or "",
-                        connection.uri or "N/A",
-                    ],
-                )
-
-            output_table(
+            # The connections arrive in one response, so unlike search results they are not streamed
+            with TableStream(
                 title="Ditto Connections",
                 columns=[
                     ("Connection ID", "left", "cyan"),
@@ -111,12 +132,20 @@ def list(
                     ("Type", "center", "yellow"),
                     ("URI", "left", "blue"),
                 ],
-                rows=rows,
-            )
+            ) as table:
+                for connection in response:
+                    table.add_row(
+                        [
+                            connection.id or "",
+                            connection.connection_status or "",
+                            connection.connection_type or "",
+                            connection.uri or "N/A",
+                        ],
+                    )
         else:
             output_json([_connection_to_dict(connection) for connection in response])
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @connection_app.command()
@@ -146,7 +175,7 @@ def get(
 
         output_json(_connection_to_dict(response))
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @connection_app.command()
@@ -167,4 +196,193 @@ def delete(
         await state.client.api.two.connections.by_connection_id(connection_id).delete()
         output_message(f"Successfully deleted connection '{connection_id}'", level="success")
 
-    asyncio.run(_run())
+    state.run(_run())
+
+
+def _metrics_table(rates: builtins.list[ConnectionRates]) -> Any:
+    rows = []
+    for rate in sorted(rates, key=lambda rate: rate.connection_id):
+        if rate.error is not None:
+            rows.append([rate.connection_id, "", "", "", "", str(rate.error)])
+            continue
+        rows.append(
+            [
+                rate.connection_id,
+                f"{rate.rate('inbound.consumed.success'):.1f}",
+                f"{rate.rate('inbound.consumed.failure'):.1f}",
+                f"{rate.rate('outbound.published.success'):.1f}",
+                f"{rate.rate('outbound.published.failure'):.1f}",
+                "yes" if rate.contains_failures else "no",
+            ]
+        )
+    return build_table(
+        title="Connection Metrics (messages/s)",
+        columns=[
+            ("Connection ID", "left", "cyan"),
+            ("Consumed", "right", "green"),
+            ("Consume Failed", "right", "red"),
+            ("Published", "right", "green"),
+            ("Publish Failed", "right", "red"),
+            ("Failures", "center", "yellow"),
+        ],
+        rows=rows,
+    )
+
+
+@connection_app.command()
+def metrics(
+    ctx: Context,
+    connection_ids: Annotated[
+        builtins.list[str] | None, typer.Argument(help="The IDs of the connections (default: all)")
+    ] = None,
+    watch: Annotated[bool, typer.Option(help="Keep polling and show message rates per interval")] = False,
+    interval: Annotated[
+        float,
+        typer.Option(
+            parser=_parse_duration, metavar="DURATION", help="Time between polls when watching (e.g., '5s', '1m')"
+        ),
+    ] = 5.0,
+    concurrency: Annotated[int, typer.Option(help="Maximum number of concurrent requests")] = 16,
+) -> None:
+    """Show connection metrics, or watch their message rates."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        ids = connection_ids or await list_connection_ids(state.client)
+
+        if not watch:
+            results = await fetch_connection_metrics(state.client, ids, concurrency)
+            output_json(
+                {
+                    connection_id: {"error": str(value)} if isinstance(value, BaseException) else value
+                    for connection_id, value in results.items()
+                }
+            )
+            return
+
+        watcher = watch_connection_metrics(state.client, ids, interval=interval, concurrency=concurrency)
+        if not state.table:
+            async for rates in watcher:
+                for rate in rates:
+                    output_ndjson(rate.to_dict())
+            return
+
+        with live_output() as live:
+            async for rates in watcher:
+                live.update(_metrics_table(rates), refresh=True)
+
+    state.run(_run())
+
+
+@connection_app.command()
+def logs(
+    ctx: Context,
+    connection_ids: Annotated[
+        builtins.list[str] | None, typer.Argument(help="The IDs of the connections (default: all)")
+    ] = None,
+    follow: Annotated[bool, typer.Option(help="Keep polling and print new entries as NDJSON")] = False,
+    interval: Annotated[
+        float,
+        typer.Option(
+            parser=_parse_duration, metavar="DURATION", help="Time between polls when following (e.g., '2s', '500ms')"
+        ),
+    ] = 2.0,
+    enable: Annotated[bool, typer.Option(help="Enable connection logging first")] = False,
+    concurrency: Annotated[int, typer.Option(help="Maximum number of concurrent requests")] = 16,
+) -> None:
+    """Show the logs of connections merged in time order, or follow new entries."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        ids = connection_ids or await list_connection_ids(state.client)
+        if enable:
+            await enable_connection_logs(state.client, ids, concurrency)
+
+        if not follow:
+            entries = await fetch_connection_logs(state.client, ids, concurrency)
+            output_json([entry.to_dict() for entry in entries])
+            return
+
+        async for entry in follow_connection_logs(state.client, ids, interval=interval, concurrency=concurrency):
+            output_ndjson(entry.to_dict())
+
+    state.run(_run())
+
+
+def _status_table(statuses: dict[str, ConnectionHealth], total: int) -> Any:
+    rows = []
+    for connection_id in sorted(statuses):
+        health = statuses[connection_id]
+        if health.error is not None:
+            rows.append([connection_id, "", "", "", "", "", str(health.error)])
+            continue
+        rows.append(
+            [
+                connection_id,
+                health.connection_status,
+                health.live_status,
+                str(health.clients),
+                str(health.sources),
+                str(health.targets),
+                "; ".join(health.problems),
+            ]
+        )
+    return build_table(
+        title=f"Connection Status ({len(statuses)}/{total})",
+        columns=[
+            ("Connection ID", "left", "cyan"),
+            ("Status", "center", "green"),
+            ("Live", "center", "green"),
+            ("Clients", "right", "yellow"),
+            ("Sources", "right", "yellow"),
+            ("Targets", "right", "yellow"),
+            ("Problems", "left", "red"),
+        ],
+        rows=rows,
+    )
+
+
+@connection_app.command()
+def status(
+    ctx: Context,
+    connection_ids: Annotated[
+        builtins.list[str] | None, typer.Argument(help="The IDs of the connections (default: all)")
+    ] = None,
+    watch: Annotated[bool, typer.Option(help="Keep refreshing the status")] = False,
+    interval: Annotated[
+        float,
+        typer.Option(
+            parser=_parse_duration, metavar="DURATION", help="Time between refreshes when watching (e.g., '10s', '1m')"
+        ),
+    ] = 10.0,
+    concurrency: Annotated[int, typer.Option(help="Maximum number of concurrent requests")] = 16,
+) -> None:
+    """Show the status of connections and their clients, sources and targets."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        ids = connection_ids or await list_connection_ids(state.client)
+
+        if not state.table:
+            if not watch:
+                output_json(
+                    [health.to_dict() for health in await fetch_connection_status(state.client, ids, concurrency)]
+                )
+                return
+            while True:
+                async for health in iter_connection_status(state.client, ids, concurrency):
+                    output_ndjson(health.to_dict())
+                await asyncio.sleep(interval)
+
+        statuses: dict[str, ConnectionHealth] = {}
+        with live_output() as live:
+            live.update(_status_table(statuses, len(ids)), refresh=True)
+            while True:
+                async for health in iter_connection_status(state.client, ids, concurrency):
+                    statuses[health.connection_id] = health
+                    live.update(_status_table(statuses, len(ids)), refresh=True)
+                if not watch:
+                    return
+                await asyncio.sleep(interval)
+
+    state.run(_run())
@@ -7,8 +7,9 @@ import typer
 from kiota_abstractions.base_request_configuration import RequestConfiguration
 from typer import Context, Typer
 
+from ditto_client._devops import log_level_override, resolve_modules, update_log_levels
 from ditto_client._types import CmdState
-from ditto_client.cli._output import model_to_dict, output_json, output_message
+from ditto_client.cli._output import model_to_dict, output_json, output_message, stdout
 from ditto_client.generated.devops.logging.logging_request_builder import LoggingRequestBuilder
 from ditto_client.generated.models.logging_update_fields import LoggingUpdateFields
 from ditto_client.generated.models.module import Module
@@ -45,7 +46,7 @@ def get(
 
         output_json(model_to_dict(response))
 
-    asyncio.run(_run())
+    state.run(_run())
 
 
 @logging_app.command()
@@ -73,4 +74,42 @@ def update(
 
         output_json(model_to_dict(response))
 
-    asyncio.run(_run())
+    state.run(_run())
+
+
+@logging_app.command("set")
+def set_level(
+    ctx: Context,
+    level: Annotated[str, typer.Argument(help="The log level, e.g. 'debug' or 'info'")],
+    modules: Annotated[list[str], typer.Argument(help="Module names or glob patterns, e.g. 'things*'")],
+    logger: Annotated[str, typer.Option(help="The logger to change")] = "org.eclipse.ditto",
+    revert_after: Annotated[
+        float | None, typer.Option(help="Restore the previous levels after this many minutes")
+    ] = None,
+    concurrency: Annotated[int, typer.Option(help="Maximum number of concurrent requests")] = 16,
+) -> None:
+    """Change the level of a logger on all pods of many modules at once."""
+    state = cast(CmdState, ctx.obj)
+
+    async def _run() -> None:
+        names = await resolve_modules(state.client, modules)
+        if not names:
+            output_message("No modules to update", level="warning")
+            return
+
+        if revert_after is None:
+            report = await update_log_levels(state.client, names, logger, level, concurrency)
+            output_json(report.to_dict())
+            if not report.successful:
+                raise typer.Exit(code=1)
+            return
+
+        async with log_level_override(state.client, names, logger, level, concurrency=concurrency) as report:
+            output_json(report.to_dict())
+            stdout().flush()
+            output_message(f"Restoring the previous levels in {revert_after:g} minute(s), interrupt to restore now")
+            # Cancelling, e.g. on an interrupt, ends the block and log_level_override restores the levels
+            await asyncio.sleep(revert_after * 60)
+        output_message("Restored the previous log levels", level="success")
+
+    state.run(_run())
@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+from typing import Annotated, cast
+
+import typer
+from typer import Context, Typer
+
+from ditto_client._devops import PiggybackTarget, run_piggyback
+from ditto_client._types import CmdState
+from ditto_client.cli._output import output_json, output_message, output_table
+
+piggyback_app = Typer()
+
+
+@piggyback_app.command()
+def run(
+    ctx: Context,
+    command_file: Annotated[Path, typer.Argument(help="Path to JSON file containing the piggyback command")],
+    targets: Annotated[
+        list[str],
+        typer.Argument(help="Targets as 'service', 'service:instance' or 'service:first-last', e.g. 'things:0-2'"),
+    ],
+    timeout: Annotated[float, typer.Option(help="Seconds all targets have to answer")] = 10.0,
+    concurrency: Annotated[int, typer.Option(help="Maximum number of concurrent requests")] = 32,
+) -> None:
+    """Send a piggyback command to many services and instances at once."""
+    state = cast(CmdState, ctx.obj)
+    try:
+        parsed = [target for spec in targets for target in PiggybackTarget.parse(spec)]
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="TARGETS") from e
+
+    async def _run() -> None:
+        command = json.loads(command_file.read_text())
+
+        results = await run_piggyback(state.client, command, parsed, timeout=timeout, concurrency=concurrency)
+
+        if state.table:
+            rows = []
+            for result in results:
+                detail = result.error if result.error is not None else result.response
+                rows.append(
+                    [
+                        result.target.service,
+                        result.target.instance or "all",
+                        result.status,
+                        str(result.status_code or ""),
+                        f"{result.elapsed:.3f}",
+                        (detail if isinstance(detail, str) else json.dumps(detail, default=str))[:120],
+                    ]
+                )
+            output_table(
+                title="Piggyback Results",
+                columns=[
+                    ("Service", "left", "cyan"),
+                    ("Instance", "center", "cyan"),
+                    ("Status", "center", "green"),
+                    ("Code", "center", "yellow"),
+                    ("Elapsed (s)", "right", "yellow"),
+                    ("Response", "left", "blue"),
+                ],
+                rows=rows,
+            )
+        else:
+            output_json([result.to_dict() for result in results])
+
+        failed = sum(1 for result in results if result.status != "ok")
+        if failed:
+            output_message(f"{failed} of {len(results)} target(s) did not succeed", level="error")
+            raise typer.Exit(code=1)
+
+    state.run(_run())
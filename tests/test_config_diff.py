@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from typer.testing import CliRunner
+
+from ditto_client.__main__ import cli_app
+from ditto_client._devops import ConfigSnapshotStore
+from ditto_client.cli.devops import _config
+
+CONFIG = {"ditto": {"things": {"timeout": "5s", "shards": 30}, "gateway": {"port": 8080}}}
+
+
+def _diff(monkeypatch: pytest.MonkeyPatch, live: Any, *args: str) -> Any:
+    async def _fetch_pod_configs(client: Any, pods: Any, path: str | None = None) -> dict[str, Any]:
+        return {pod: live for pod in pods}
+
+    monkeypatch.setattr(_config, "fetch_pod_configs", _fetch_pod_configs)
+    result = CliRunner().invoke(
+        cli_app, ["--username", "user", "--password", "pass", "devops", "config", "diff", *args]
+    )
+    assert result.exit_code == 0, result.output
+    return json.loads(result.stdout)
+
+
+def test_full_snapshot_against_live_config_below_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    ConfigSnapshotStore(tmp_path).save("things/things-0", CONFIG)
+    live = {"timeout": "10s", "shards": 30}
+
+    deltas = _diff(
+        monkeypatch, live, "things/things-0@latest", "--path", "ditto.things", "--snapshot-dir", str(tmp_path)
+    )
+
+    assert deltas == [{"path": "timeout", "left": "5s", "right": "10s"}]
+
+
+def test_snapshot_below_path_against_live_config_below_same_path(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    ConfigSnapshotStore(tmp_path).save("things/things-0", CONFIG["ditto"]["things"], path="ditto.things")
+
+    deltas = _diff(
+        monkeypatch,
+        CONFIG["ditto"]["things"],
+        "things/things-0@latest",
+        "--path",
+        "ditto.things",
+        "--snapshot-dir",
+        str(tmp_path),
+    )
+
+    assert deltas == []
+
+
+def test_snapshot_below_other_path_is_refused(tmp_path: Path) -> None:
+    store = ConfigSnapshotStore(tmp_path)
+    timestamp = store.save("things/things-0", CONFIG["ditto"]["things"], path="ditto.things")
+
+    with pytest.raises(LookupError):
+        store.load("things/things-0", timestamp, "ditto.gateway")
+    with pytest.raises(LookupError):
+        store.load("things/things-0", timestamp)
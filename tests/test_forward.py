@@ -0,0 +1,63 @@
+import os
+import socket
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from ditto_client import _forward
+
+
+@pytest.fixture
+def listener(tmp_path: Path) -> Iterator[tuple[str, Callable[[], list[bytes]]]]:
+    path = str(tmp_path / "daemon.sock")
+    received: list[bytes] = []
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+
+    def _serve() -> None:
+        conn, _ = server.accept()
+        with conn:
+            conn.settimeout(1)
+            try:
+                received.append(conn.recv(65536))
+                conn.sendall(b'{"out": "ok\\n", "exit": 0}\n')
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=_serve, daemon=True)
+    thread.start()
+
+    def _received() -> list[bytes]:
+        thread.join(2)
+        return received
+
+    yield path, _received
+    server.close()
+
+
+def test_forwards_to_daemon_of_same_user(
+    listener: tuple[str, Callable[[], list[bytes]]], monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path, received = listener
+    monkeypatch.setenv("DITTO_PASSWORD", "secret")
+
+    assert _forward.forward(path, ["search", "count"]) == 0
+
+    assert capsys.readouterr().out == "ok\n"
+    assert b"secret" in received()[0]
+
+
+def test_does_not_send_credentials_to_daemon_of_other_user(
+    listener: tuple[str, Callable[[], list[bytes]]], monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path, received = listener
+    monkeypatch.setenv("DITTO_PASSWORD", "secret")
+    monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+
+    assert _forward.forward(path, ["search", "count"]) == 1
+
+    assert "another user" in capsys.readouterr().err
+    assert received() == [b""]
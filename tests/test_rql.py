@@ -0,0 +1,19 @@
+import pytest
+
+from ditto_client import Eq, Query, parse_filter
+
+
+def test_metadata_is_searchable() -> None:
+    query = parse_filter('and(eq(_metadata/attributes/location/issuedBy,"ops"),exists(_metadata/features))')
+
+    assert query.warnings() == []
+
+
+def test_unknown_root_is_not_searchable() -> None:
+    assert parse_filter('eq(location,"kitchen")').warnings() == ["'location' is not a searchable field"]
+
+
+def test_query_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        Query()  # type: ignore[abstract]
+    assert Eq("thingId", "my.sensors:a").to_rql() == 'eq(thingId,"my.sensors:a")'
@@ -0,0 +1,36 @@
+from typing import Any
+
+import pytest
+from typer.testing import CliRunner
+
+from ditto_client.__main__ import cli_app
+from ditto_client._search_count import CountCache
+
+
+@pytest.fixture
+def requests(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+    requests: list[Any] = []
+
+    async def _request(self: CountCache, key: Any) -> int:
+        requests.append(key)
+        return 42
+
+    monkeypatch.setattr(CountCache, "_request", _request)
+    return requests
+
+
+def test_second_count_in_session_makes_no_request(requests: list[Any]) -> None:
+    script = "\n".join(
+        [
+            "search count --filter 'eq(attributes/location,\"kitchen\")'",
+            "search count --filter 'eq(attributes/location, \"kitchen\")'",
+            "search count --namespaces my.sensors --group-by namespace",
+            "search count --namespaces my.sensors --group-by namespace",
+        ]
+    )
+
+    result = CliRunner().invoke(cli_app, ["--username", "user", "--password", "pass", "batch", "-"], input=script)
+
+    assert result.exit_code == 0, result.output
+    assert len(requests) == 2
+    assert result.stdout.count('"count": 42') == 4